@@ -94,7 +94,6 @@ def main():
         # Extract and display parameter section
         code = code_result['scad_code']
         if "// PARAMETERS" in code:
-            param_section = code.split("// MODEL DEFINITION")[0]
             print("  ✓ Available parameters found")
         else:
             print("  ✓ Model code retrieved")
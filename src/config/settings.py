@@ -3,7 +3,7 @@
 import os
 from pathlib import Path
 from typing import Optional
-from functools import lru_cache
+from functools import lru_cache, cached_property
 
 
 class Settings:
@@ -15,8 +15,8 @@ class Settings:
     """
     
     def __init__(self):
-        # Workspace configuration
-        self.workspace_dir: Path = Path(os.getenv("WORKSPACE_DIR", "./workspace")).resolve()
+        # Workspace configuration (resolved on first use, see workspace_dir)
+        self._workspace_env: str = os.getenv("WORKSPACE_DIR", "./workspace")
         
         # External tool binaries
         self.openscad_bin: str = os.getenv("OPENSCAD_BIN", "openscad")
@@ -31,14 +31,28 @@ class Settings:
         transport_env = os.getenv("MCP_TRANSPORT", "stdio")
         self.mcp_transport: str = transport_env if transport_env in valid_transports else "stdio"
         
+        # Optional tool groups (both on by default)
+        self.enable_filesystem_tools: bool = (
+            os.getenv("ENABLE_FILESYSTEM_TOOLS", "true").lower() in ("true", "1", "yes")
+        )
+        self.enable_terminal_tools: bool = (
+            os.getenv("ENABLE_TERMINAL_TOOLS", "true").lower() in ("true", "1", "yes")
+        )
+        
         # Performance tuning
         self.max_output_length: int = int(os.getenv("MAX_OUTPUT_LENGTH", "10000"))
         self.command_timeout: int = int(os.getenv("COMMAND_TIMEOUT", "120"))
         self.slice_timeout: int = int(os.getenv("SLICE_TIMEOUT", "300"))
+        self.preview_cache_size: int = int(os.getenv("PREVIEW_CACHE_SIZE", "256"))
+        self.gcode_cache_size: int = int(os.getenv("GCODE_CACHE_SIZE", "32"))
+        self.openscad_concurrency: int = max(
+            1, int(os.getenv("OPENSCAD_CONCURRENCY", str(os.cpu_count() or 2)))
+        )
         
         # Web server configuration
         self.web_host: str = os.getenv("WEB_HOST", "127.0.0.1")
         self.web_port: int = int(os.getenv("WEB_PORT", "8080"))
+        self.web_workers: int = int(os.getenv("WEB_CONCURRENCY", "1"))
         
         # OAuth configuration
         self.oauth_enabled: bool = os.getenv("OAUTH_ENABLED", "false").lower() in ("true", "1", "yes")
@@ -53,6 +67,9 @@ class Settings:
         # Logging configuration
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
         
+        # Set once ensure_workspace() has created the directories
+        self._workspace_ready = False
+    
     def validate(self) -> list[str]:
         """
         Validate configuration and return list of warnings/errors.
@@ -64,7 +81,7 @@ class Settings:
         
         # Check if workspace can be created
         try:
-            self.workspace_dir.mkdir(parents=True, exist_ok=True)
+            self.ensure_workspace()
         except Exception as e:
             messages.append(f"Cannot create workspace directory: {e}")
         
@@ -98,15 +115,35 @@ class Settings:
         
         return messages
     
+    @cached_property
+    def workspace_dir(self) -> Path:
+        """Get the absolute workspace directory, resolved on first access."""
+        # Resolved once here, so every path built under it is already absolute
+        return Path(self._workspace_env).resolve()
+    
     @property
     def models_dir(self) -> Path:
         """Get the models directory within the workspace."""
         return self.workspace_dir / "models"
     
+    @property
+    def preview_cache_dir(self) -> Path:
+        """Get the content-addressed preview cache directory within the workspace."""
+        return self.workspace_dir / "previews_cache"
+    
+    @property
+    def gcode_cache_dir(self) -> Path:
+        """Get the content-addressed G-code cache directory within the workspace."""
+        return self.workspace_dir / "gcode_cache"
+    
     def ensure_workspace(self) -> None:
-        """Ensure workspace and models directories exist."""
-        self.workspace_dir.mkdir(parents=True, exist_ok=True)
-        self.models_dir.mkdir(exist_ok=True)
+        """Ensure workspace and models directories exist (once per process)."""
+        if self._workspace_ready:
+            return
+        # models_dir is inside workspace_dir, so one mkdir covers both; the
+        # parent is only created if this first attempt fails with ENOENT
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        self._workspace_ready = True
 
 
 @lru_cache()
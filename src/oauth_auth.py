@@ -1,21 +1,23 @@
 """OAuth authentication module for the MCP server."""
 
 import logging
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from functools import wraps
-from authlib.integrations.starlette_client import OAuth
 from starlette.requests import Request
 from starlette.responses import RedirectResponse, JSONResponse
 
 from config import get_settings
 
+if TYPE_CHECKING:
+    from authlib.integrations.starlette_client import OAuth
+
 logger = logging.getLogger(__name__)
 
 # Global OAuth client
-_oauth_client: Optional[OAuth] = None
+_oauth_client: Optional["OAuth"] = None
 
 
-def init_oauth() -> Optional[OAuth]:
+def init_oauth() -> Optional["OAuth"]:
     """
     Initialize OAuth client with configured settings.
     
@@ -40,6 +42,9 @@ def init_oauth() -> Optional[OAuth]:
         return None
     
     try:
+        # Imported here so stdio and OAuth-disabled runs never load authlib
+        from authlib.integrations.starlette_client import OAuth
+        
         _oauth_client = OAuth()
         _oauth_client.register(
             name='pcmcp',
@@ -57,7 +62,7 @@ def init_oauth() -> Optional[OAuth]:
         return None
 
 
-def get_oauth_client() -> Optional[OAuth]:
+def get_oauth_client() -> Optional["OAuth"]:
     """Get the OAuth client instance."""
     return _oauth_client
 
@@ -86,14 +91,20 @@ def require_auth(func):
     """
     Decorator to require authentication for a route.
     
+    When OAuth is disabled every request is authenticated, so the route is
+    returned unwrapped and pays no per-request overhead.
+    
     Usage:
         @require_auth
         async def my_route(request):
             ...
     """
+    if not get_settings().oauth_enabled:
+        return func
+    
     @wraps(func)
     async def wrapper(request: Request):
-        if not is_authenticated(request):
+        if request.session.get('user') is None:
             return JSONResponse(
                 {"error": "Authentication required"},
                 status_code=401
@@ -20,40 +20,48 @@ Environment Variables:
 - OCTOPRINT_URL: OctoPrint URL (e.g., http://localhost:5000)
 - OCTOPRINT_API_KEY: API key for OctoPrint authentication
 - MCP_TRANSPORT: Transport protocol (stdio, sse, or streamable-http; default: stdio)
+- OPENSCAD_CONCURRENCY: Maximum simultaneous OpenSCAD preview renders (default: CPU count)
+- ENABLE_FILESYSTEM_TOOLS: Register filesystem_* tools (default: true)
+- ENABLE_TERMINAL_TOOLS: Register terminal_* tools (default: true)
 
 Command-line Arguments:
 - --transport: Override MCP_TRANSPORT setting (stdio, sse, or streamable-http)
 - --web: Enable web control panel (runs on port 8080)
 - --port: Port for web control panel (default: 8080)
 - --host: Host to bind web server to (default: 127.0.0.1)
+- --workers: Web server worker processes (default: WEB_CONCURRENCY or 1)
 """
 
 import sys
+import time
+import asyncio
+import inspect
 import logging
 import argparse
-import atexit
 import signal
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
 
+import anyio
+
 # Ensure parent directory is in Python path for relative imports
 _src_dir = Path(__file__).parent
 if str(_src_dir) not in sys.path:
     sys.path.insert(0, str(_src_dir))
 
+# Web control panel assets
+_STATIC_DIR = _src_dir / "static"
+_INDEX_HTML = _STATIC_DIR / "index.html"
+
 from mcp.server.fastmcp import FastMCP
+from pydantic_core import from_json, to_json
 
 # Import configuration
 from config import get_settings
 
 # Import services
-from services import (
-    CADService,
-    SlicerService,
-    PrinterService,
-    WorkspaceService,
-    FilesystemService,
-    TerminalService,
-)
+from services import get_services
 
 # Import tool registration functions
 from tools import (
@@ -65,26 +73,62 @@ from tools import (
     register_terminal_tools,
 )
 
-# Optional web server imports - only needed for --web mode
+# Optional web server imports - only needed for --web mode. FastMCP already
+# loads these modules; the web-only ones (StaticFiles, SessionMiddleware and
+# its itsdangerous dependency) are imported in create_web_app() instead.
 try:
     from starlette.applications import Starlette
     from starlette.routing import Route, Mount
-    from starlette.responses import JSONResponse, FileResponse
-    from starlette.staticfiles import StaticFiles
-    from starlette.middleware.sessions import SessionMiddleware
+    from starlette.responses import Response, JSONResponse
     import uvicorn
+    
+    class FastJSONResponse(JSONResponse):
+        """JSONResponse rendered by pydantic_core's native encoder."""
+        
+        def render(self, content) -> bytes:
+            return to_json(content)
+    
     WEB_DEPENDENCIES_AVAILABLE = True
 except ImportError as e:
     WEB_DEPENDENCIES_AVAILABLE = False
     _MISSING_WEB_DEP = str(e)
 
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the date/time part of asctime once per second."""
+    
+    _cached_time = (None, "")
+    
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        if second != self._cached_time[0]:
+            self._cached_time = (
+                second,
+                time.strftime(self.default_time_format, self.converter(record.created))
+            )
+        return self.default_msec_format % (self._cached_time[1], record.msecs)
+
+
 # Configure logging
+# Logs must go to stderr: under stdio transport stdout carries the JSON-RPC
+# stream and any stray write would corrupt it.
+_log_handler = logging.StreamHandler(sys.stderr)
+_log_handler.setFormatter(
+    CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+_log_level = get_settings().log_level.upper()
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[_log_handler],
+    # Fall back to INFO for unrecognized LOG_LEVEL values
+    level=_log_level if isinstance(logging.getLevelName(_log_level), int) else logging.INFO
 )
 logger = logging.getLogger(__name__)
 
+# Separator line for startup banners
+_BAR = "=" * 80
+
 # OAuth imports
 try:
     from oauth_auth import (
@@ -100,48 +144,50 @@ except ImportError as e:
     OAUTH_AVAILABLE = False
     logger.warning(f"OAuth dependencies not available: {e}")
 
-# Global service instances for cleanup
-_printer_service = None
-
-
 # ============================================================================
 # LIFECYCLE MANAGEMENT
 # ============================================================================
 
 async def cleanup_services():
     """Clean up service resources on shutdown."""
-    global _printer_service
-    if _printer_service is not None:
+    # Nothing to close if no service was ever created
+    if get_services.cache_info().currsize:
         logger.info("Cleaning up printer service...")
-        await _printer_service.close()
+        await get_services().printer.close()
 
 
 def register_cleanup_handlers():
-    """Register cleanup handlers for graceful shutdown."""
-    import asyncio
-    
-    def sync_cleanup():
-        """Synchronous cleanup wrapper."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                loop.create_task(cleanup_services())
-            else:
-                loop.run_until_complete(cleanup_services())
-        except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
-    
-    # Register cleanup on normal exit
-    atexit.register(sync_cleanup)
-    
-    # Register cleanup on SIGTERM/SIGINT
-    def signal_handler(signum, frame):
-        logger.info("Received shutdown signal, cleaning up...")
-        sync_cleanup()
-        sys.exit(0)
+    """Make SIGTERM shut the server down the same way as Ctrl+C."""
+    # Raising KeyboardInterrupt unwinds the running event loop normally, so
+    # the cleanup in run_mcp_server() runs in the loop that owns the
+    # service resources
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+
+async def run_mcp_server(mcp: FastMCP, transport: str):
+    """
+    Run the MCP server, cleaning up services in the same event loop on exit.
     
-    signal.signal(signal.SIGTERM, signal_handler)
-    signal.signal(signal.SIGINT, signal_handler)
+    Args:
+        mcp: Configured FastMCP instance
+        transport: "stdio" or "sse"
+    """
+    try:
+        if transport == "sse":
+            await mcp.run_sse_async()
+        else:
+            await mcp.run_stdio_async()
+    finally:
+        # Shielded so cleanup still runs when shutdown arrives as cancellation
+        with anyio.CancelScope(shield=True):
+            await cleanup_services()
+
+
+@asynccontextmanager
+async def web_lifespan(app):
+    """Starlette lifespan that cleans up services on shutdown."""
+    yield
+    await cleanup_services()
 
 
 # ============================================================================
@@ -155,26 +201,22 @@ def create_mcp_server() -> FastMCP:
     Returns:
         Configured FastMCP instance
     """
-    global _printer_service
-    
     # Initialize FastMCP server
     mcp = FastMCP("CadSlicerPrinter", json_response=True)
     
-    # Initialize services
-    cad_service = CADService()
-    slicer_service = SlicerService()
-    _printer_service = PrinterService()  # Store for cleanup
-    workspace_service = WorkspaceService()
-    filesystem_service = FilesystemService()
-    terminal_service = TerminalService()
+    # Services are shared with the web API
+    services = get_services()
     
     # Register all tools
-    register_cad_tools(mcp, cad_service)
-    register_slicer_tools(mcp, slicer_service)
-    register_printer_tools(mcp, _printer_service)
-    register_workspace_tools(mcp, workspace_service)
-    register_filesystem_tools(mcp, filesystem_service)
-    register_terminal_tools(mcp, terminal_service)
+    register_cad_tools(mcp, services.cad)
+    register_slicer_tools(mcp, services.slicer)
+    register_printer_tools(mcp, services.printer)
+    register_workspace_tools(mcp, services.workspace)
+    settings = get_settings()
+    if settings.enable_filesystem_tools:
+        register_filesystem_tools(mcp, services.filesystem)
+    if settings.enable_terminal_tools:
+        register_terminal_tools(mcp, services.terminal)
     
     return mcp
 
@@ -188,65 +230,88 @@ def startup_checks():
     Perform startup checks and log configuration status.
     """
     settings = get_settings()
+    # The banner is INFO only; skip building it when INFO is filtered out
+    info_enabled = logger.isEnabledFor(logging.INFO)
     
-    logger.info("=" * 80)
-    logger.info("CadSlicerPrinter MCP Server Starting (Redesigned)")
-    logger.info("=" * 80)
+    # Log the banner as a few multi-line records instead of one record per line
+    if info_enabled:
+        logger.info("\n".join([
+            _BAR,
+            "CadSlicerPrinter MCP Server Starting (Redesigned)",
+            _BAR,
+        ]))
     
     # Ensure workspace exists
+    workspace_ok = False
     try:
         settings.ensure_workspace()
-        logger.info(f"✓ Workspace directory: {settings.workspace_dir}")
+        workspace_ok = True
     except Exception as e:
         logger.error(f"✗ Failed to create workspace directory: {e}")
     
     # Validate configuration
     validation_messages = settings.validate()
     if validation_messages:
-        logger.warning("Configuration warnings:")
-        for msg in validation_messages:
-            logger.warning(f"  ⚠ {msg}")
+        logger.warning("\n".join(
+            ["Configuration warnings:"] + [f"  ⚠ {msg}" for msg in validation_messages]
+        ))
+    
+    if not info_enabled:
+        return
     
     # Log configuration
-    logger.info(f"✓ MCP Transport: {settings.mcp_transport}")
+    lines = []
+    if workspace_ok:
+        lines.append(f"✓ Workspace directory: {settings.workspace_dir}")
+    lines.append(f"✓ MCP Transport: {settings.mcp_transport}")
     if settings.openscad_bin:
-        logger.info(f"✓ OpenSCAD binary: {settings.openscad_bin}")
+        lines.append(f"✓ OpenSCAD binary: {settings.openscad_bin}")
     if settings.slicer_bin:
-        logger.info(f"✓ Slicer binary: {settings.slicer_bin}")
+        lines.append(f"✓ Slicer binary: {settings.slicer_bin}")
     if settings.octoprint_url:
-        logger.info(f"✓ OctoPrint URL: {settings.octoprint_url}")
+        lines.append(f"✓ OctoPrint URL: {settings.octoprint_url}")
     if settings.octoprint_api_key:
-        logger.info(f"✓ OctoPrint API key: {settings.octoprint_api_key[:8]}...")
-    
-    logger.info("=" * 80)
-    logger.info("Server ready. Available tools:")
-    logger.info("  CAD Design:")
-    logger.info("    - cad_create_model")
-    logger.info("    - cad_get_code")
-    logger.info("    - cad_update_parameters")
-    logger.info("    - cad_modify_model")
-    logger.info("    - cad_render_preview")
-    logger.info("    - cad_list_previews")
-    logger.info("  Slicing:")
-    logger.info("    - slicer_slice_model")
-    logger.info("  Printing:")
-    logger.info("    - printer_status")
-    logger.info("    - printer_upload_and_start")
-    logger.info("    - printer_send_gcode_line")
-    logger.info("  Workspace:")
-    logger.info("    - workspace_list_models")
-    logger.info("  Filesystem:")
-    logger.info("    - filesystem_read_file")
-    logger.info("    - filesystem_write_file")
-    logger.info("    - filesystem_list_directory")
-    logger.info("    - filesystem_create_directory")
-    logger.info("    - filesystem_delete_path")
-    logger.info("    - filesystem_get_info")
-    logger.info("  Terminal:")
-    logger.info("    - terminal_execute")
-    logger.info("    - terminal_get_cwd")
-    logger.info("    - terminal_get_env")
-    logger.info("=" * 80)
+        lines.append(f"✓ OctoPrint API key: {settings.octoprint_api_key[:8]}...")
+    
+    lines.extend([
+        _BAR,
+        "Server ready. Available tools:",
+        "  CAD Design:",
+        "    - cad_create_model",
+        "    - cad_get_code",
+        "    - cad_update_parameters",
+        "    - cad_modify_model",
+        "    - cad_render_preview",
+        "    - cad_render_previews",
+        "    - cad_list_previews",
+        "  Slicing:",
+        "    - slicer_slice_model",
+        "  Printing:",
+        "    - printer_status",
+        "    - printer_upload_and_start",
+        "    - printer_send_gcode_line",
+        "  Workspace:",
+        "    - workspace_list_models",
+    ])
+    if settings.enable_filesystem_tools:
+        lines.extend([
+            "  Filesystem:",
+            "    - filesystem_read_file",
+            "    - filesystem_write_file",
+            "    - filesystem_list_directory",
+            "    - filesystem_create_directory",
+            "    - filesystem_delete_path",
+            "    - filesystem_get_info",
+        ])
+    if settings.enable_terminal_tools:
+        lines.extend([
+            "  Terminal:",
+            "    - terminal_execute",
+            "    - terminal_get_cwd",
+            "    - terminal_get_env",
+        ])
+    lines.append(_BAR)
+    logger.info("\n".join(lines))
 
 
 def parse_arguments():
@@ -258,6 +323,17 @@ def parse_arguments():
     """
     settings = get_settings()
     
+    # No arguments is how MCP clients launch the stdio server; the defaults
+    # are known without building a parser
+    if len(sys.argv) == 1:
+        return argparse.Namespace(
+            transport=settings.mcp_transport,
+            web=False,
+            port=settings.web_port,
+            host=settings.web_host,
+            workers=settings.web_workers
+        )
+    
     parser = argparse.ArgumentParser(
         description="CadSlicerPrinter MCP Server - 3D model design, slicing, and printing"
     )
@@ -285,6 +361,12 @@ def parse_arguments():
         default=settings.web_host,
         help=f"Host to bind web server to (default: {settings.web_host} for localhost only)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.web_workers,
+        help=f"Number of web server worker processes (default: {settings.web_workers})"
+    )
     return parser.parse_args()
 
 
@@ -292,11 +374,9 @@ def parse_arguments():
 # WEB API ENDPOINTS (for frontend control panel)
 # ============================================================================
 
-# Create services for web API
-_cad_service = CADService()
-_slicer_service = SlicerService()
-_printer_service = PrinterService()
-_workspace_service = WorkspaceService()
+async def read_json(request):
+    """Parse a request body as JSON straight from bytes (native parser)."""
+    return from_json(await request.body())
 
 
 # Helper function to check authentication
@@ -305,14 +385,13 @@ def check_auth(request):
     settings = get_settings()
     if settings.oauth_enabled and OAUTH_AVAILABLE:
         if not is_authenticated(request):
-            return JSONResponse(
+            return FastJSONResponse(
                 {"error": "Authentication required", "authenticated": False},
                 status_code=401
             )
     return None
 
 
-# Web API endpoints that wrap service methods
 async def api_health(request):
     """
     Health check endpoint - always public for monitoring and load balancers.
@@ -320,170 +399,219 @@ async def api_health(request):
     This endpoint intentionally does not require authentication to allow
     external monitoring tools and load balancers to check service status.
     """
-    return JSONResponse({"status": "ok", "server": "CadSlicerPrinter"})
-
-
-async def api_cad_create(request):
-    """Create a new CAD model"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    return FastJSONResponse({"status": "ok", "server": "CadSlicerPrinter"})
+
+
+# Web API endpoints that wrap service methods:
+# (path, HTTP method, service, service method, {body field: default})
+# GET endpoints take no body; POST endpoints pass the listed JSON fields
+# (or their defaults) to the service method as keyword arguments.
+_API_ROUTES = [
+    ("/api/cad/create", "POST", "cad", "create_model", {"description": ""}),
+    ("/api/cad/modify", "POST", "cad", "add_modification_note",
+     {"model_id": "", "instruction": ""}),
+    ("/api/cad/get-code", "POST", "cad", "get_code", {"model_id": ""}),
+    ("/api/cad/update-parameters", "POST", "cad", "update_parameters",
+     {"model_id": "", "parameters": {}}),
+    ("/api/cad/preview", "POST", "cad", "render_preview",
+     {"model_id": "", "view": "iso", "width": 800, "height": 600, "quality": "fast"}),
+    ("/api/cad/list-previews", "POST", "cad", "list_previews", {"model_id": ""}),
+    ("/api/slicer/slice", "POST", "slicer", "slice_model",
+     {"model_id": "", "profile": "", "extra_args": None}),
+    ("/api/printer/status", "GET", "printer", "get_status", {}),
+    ("/api/printer/upload-and-start", "POST", "printer", "upload_and_start", {"model_id": ""}),
+    ("/api/printer/send-gcode", "POST", "printer", "send_gcode", {"gcode": ""}),
+    ("/api/workspace/models", "GET", "workspace", "list_models", {}),
+]
+
+
+# Seconds a GET endpoint's serialized response is reused. Printer status
+# is polled and changes slowly, so back-to-back polls share one OctoPrint
+# round-trip.
+_API_CACHE_TTL = {
+    "/api/printer/status": 0.5,
+}
+
+
+def service_caller(method):
+    """
+    Wrap a service method as a coroutine function.
     
-    data = await request.json()
-    result = _cad_service.create_model(description=data.get("description", ""))
-    return JSONResponse(result)
-
-
-async def api_cad_modify(request):
-    """Modify an existing CAD model"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    Args:
+        method: Bound service method (sync or async)
+        
+    Returns:
+        Coroutine function taking the method's keyword arguments
+    """
+    if inspect.iscoroutinefunction(method):
+        return method
     
-    data = await request.json()
-    result = _cad_service.add_modification_note(
-        model_id=data.get("model_id", ""),
-        instruction=data.get("instruction", "")
-    )
-    return JSONResponse(result)
-
-
-async def api_cad_get_code(request):
-    """Get the OpenSCAD code for a model"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    async def call(**kwargs):
+        # The synchronous CAD/workspace methods do file I/O; a worker
+        # thread keeps those syscalls off the event loop
+        return await anyio.to_thread.run_sync(partial(method, **kwargs))
     
-    data = await request.json()
-    result = _cad_service.get_code(model_id=data.get("model_id", ""))
-    return JSONResponse(result)
+    return call
 
 
-async def api_cad_update_parameters(request):
-    """Update parameters in a CAD model"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+def make_api_handler(method, fields, cache_ttl=0.0):
+    """
+    Build an authenticated endpoint that calls a service method.
     
-    data = await request.json()
-    result = _cad_service.update_parameters(
-        model_id=data.get("model_id", ""),
-        parameters=data.get("parameters", {})
-    )
-    return JSONResponse(result)
-
-
-async def api_cad_preview(request):
-    """Render a preview of a CAD model"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    Args:
+        method: Bound service method to call
+        fields: Mapping of JSON body field to default value
+        cache_ttl: Seconds to reuse the serialized response (body-less endpoints only)
+        
+    Returns:
+        Async request handler for a Starlette Route
+    """
+    # Decided once here rather than on every request
+    call = service_caller(method)
+    cached = (float("-inf"), b"")
+    
+    async def handler(request):
+        nonlocal cached
+        auth_error = check_auth(request)
+        if auth_error:
+            return auth_error
+        
+        if cache_ttl and time.monotonic() - cached[0] < cache_ttl:
+            return Response(cached[1], media_type="application/json")
+        
+        kwargs = {}
+        if fields:
+            data = await read_json(request)
+            kwargs = {name: data.get(name, default) for name, default in fields.items()}
+        
+        result = await call(**kwargs)
+        
+        response = FastJSONResponse(result)
+        if cache_ttl:
+            cached = (time.monotonic(), response.body)
+        return response
     
-    data = await request.json()
-    result = await _cad_service.render_preview(
-        model_id=data.get("model_id", ""),
-        view=data.get("view", "iso"),
-        width=data.get("width", 800),
-        height=data.get("height", 600)
-    )
-    return JSONResponse(result)
+    return handler
 
 
-async def api_cad_list_previews(request):
-    """List previews for a model"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+def make_batch_handler(operations):
+    """
+    Build an authenticated endpoint that runs several operations per request.
     
-    data = await request.json()
-    result = _cad_service.list_previews(model_id=data.get("model_id", ""))
-    return JSONResponse(result)
-
-
-async def api_slicer_slice(request):
-    """Slice a model"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    The body is {"ops": [{"op": name, <fields>}, ...], "parallel": false}.
+    Ops run one after another by default, since a typical batch (update
+    parameters, then render a preview) depends on the previous step;
+    "parallel": true runs them concurrently. Results keep the op order.
     
-    data = await request.json()
-    result = await _slicer_service.slice_model(
-        model_id=data.get("model_id", ""),
-        profile=data.get("profile", ""),
-        extra_args=data.get("extra_args")
-    )
-    return JSONResponse(result)
-
-
-async def api_printer_status(request):
-    """Get printer status"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    Args:
+        operations: Mapping of op name to (bound service method, {field: default})
+        
+    Returns:
+        Async request handler for a Starlette Route
+    """
+    callers = {
+        name: (service_caller(method), fields)
+        for name, (method, fields) in operations.items()
+    }
+    
+    async def run(op):
+        entry = callers.get(op.get("op")) if isinstance(op, dict) else None
+        if entry is None:
+            return {
+                "error": f"Unknown op: {op.get('op') if isinstance(op, dict) else op}",
+                "details": f"Valid ops: {', '.join(callers)}"
+            }
+        call, fields = entry
+        return await call(**{name: op.get(name, default) for name, default in fields.items()})
+    
+    async def handler(request):
+        auth_error = check_auth(request)
+        if auth_error:
+            return auth_error
+        
+        data = await read_json(request)
+        ops = data.get("ops")
+        if not isinstance(ops, list):
+            return FastJSONResponse(
+                {"error": "Invalid batch", "details": "Body must contain an ops list"},
+                status_code=400
+            )
+        
+        if data.get("parallel"):
+            results = await asyncio.gather(*(run(op) for op in ops))
+        else:
+            results = [await run(op) for op in ops]
+        
+        return FastJSONResponse({"results": results})
     
-    result = await _printer_service.get_status()
-    return JSONResponse(result)
+    return handler
 
 
-async def api_printer_upload_and_start(request):
-    """Upload and start print"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+def create_static_files():
+    """
+    Build the app serving the web interface's static files.
     
-    data = await request.json()
-    result = await _printer_service.upload_and_start(model_id=data.get("model_id", ""))
-    return JSONResponse(result)
-
-
-async def api_printer_send_gcode(request):
-    """Send G-code command"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    The assets keep fixed names across releases, so browsers are told to
+    revalidate them (Cache-Control: no-cache) rather than cache them for
+    long; unchanged files are then answered with 304 Not Modified from
+    their ETag/Last-Modified.
     
-    data = await request.json()
-    result = await _printer_service.send_gcode(gcode=data.get("gcode", ""))
-    return JSONResponse(result)
-
-
-async def api_workspace_models(request):
-    """List all workspace models"""
-    auth_error = check_auth(request)
-    if auth_error:
-        return auth_error
+    Returns:
+        StaticFiles app for the static directory
+    """
+    from starlette.staticfiles import StaticFiles
     
-    result = _workspace_service.list_models()
-    return JSONResponse(result)
+    class RevalidatedStaticFiles(StaticFiles):
+        def file_response(self, *args, **kwargs):
+            response = super().file_response(*args, **kwargs)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+    
+    return RevalidatedStaticFiles(directory=str(_STATIC_DIR))
 
 
 async def index(request):
     """Serve the main web interface"""
-    static_dir = Path(__file__).parent / "static"
-    return FileResponse(static_dir / "index.html")
+    # Served by the static app so conditional requests get a 304
+    return await request.app.state.static_files.get_response(_INDEX_HTML.name, request.scope)
 
 
 # Create web application with both MCP and web API
 def create_web_app():
     """Create a Starlette application with both MCP and web API endpoints"""
+    from starlette.middleware.gzip import GZipMiddleware
+    from starlette.middleware.sessions import SessionMiddleware
+    
     settings = get_settings()
-    static_dir = Path(__file__).parent / "static"
+    static_files = create_static_files()
+    
+    services = get_services()
+    api_routes = [
+        Route(
+            path,
+            make_api_handler(
+                getattr(getattr(services, service), name),
+                fields,
+                _API_CACHE_TTL.get(path, 0.0)
+            ),
+            methods=[http_method]
+        )
+        for path, http_method, service, name, fields in _API_ROUTES
+    ]
+    
+    # /api/cad/batch ops are named after the CAD endpoints ("get-code", ...)
+    cad_operations = {
+        path.rsplit("/", 1)[1]: (getattr(services.cad, name), fields)
+        for path, _, service, name, fields in _API_ROUTES
+        if service == "cad"
+    }
     
     routes = [
         Route("/", index),
         Route("/api/health", api_health, methods=["GET"]),
-        Route("/api/cad/create", api_cad_create, methods=["POST"]),
-        Route("/api/cad/modify", api_cad_modify, methods=["POST"]),
-        Route("/api/cad/get-code", api_cad_get_code, methods=["POST"]),
-        Route("/api/cad/update-parameters", api_cad_update_parameters, methods=["POST"]),
-        Route("/api/cad/preview", api_cad_preview, methods=["POST"]),
-        Route("/api/cad/list-previews", api_cad_list_previews, methods=["POST"]),
-        Route("/api/slicer/slice", api_slicer_slice, methods=["POST"]),
-        Route("/api/printer/status", api_printer_status, methods=["GET"]),
-        Route("/api/printer/upload-and-start", api_printer_upload_and_start, methods=["POST"]),
-        Route("/api/printer/send-gcode", api_printer_send_gcode, methods=["POST"]),
-        Route("/api/workspace/models", api_workspace_models, methods=["GET"]),
-        Mount("/static", StaticFiles(directory=str(static_dir)), name="static"),
+        *api_routes,
+        Route("/api/cad/batch", make_batch_handler(cad_operations), methods=["POST"]),
+        Mount("/static", static_files, name="static"),
     ]
     
     # Add OAuth routes if enabled
@@ -495,7 +623,13 @@ def create_web_app():
             Route("/auth/user", user_info, methods=["GET"]),
         ])
     
-    app = Starlette(routes=routes)
+    app = Starlette(routes=routes, lifespan=web_lifespan)
+    app.state.static_files = static_files
+    
+    # Compresses the HTML/JS/CSS and larger JSON responses (G-code
+    # listings, SCAD source). Level 6 keeps the CPU cost reasonable on a
+    # Raspberry Pi; PNGs and event streams are skipped by default
+    app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=6)
     
     # Add session middleware for OAuth
     if settings.oauth_enabled and OAUTH_AVAILABLE:
@@ -511,7 +645,39 @@ def create_web_app():
     return app
 
 
-def run_web_server(host="127.0.0.1", port=8080):
+# Level names uvicorn's log_level accepts, least severe first (trace is
+# uvicorn's own level 5)
+_UVICORN_LOG_LEVELS = (
+    ("trace", 5),
+    ("debug", logging.DEBUG),
+    ("info", logging.INFO),
+    ("warning", logging.WARNING),
+    ("error", logging.ERROR),
+    ("critical", logging.CRITICAL),
+)
+
+
+def uvicorn_log_level(level: int) -> str:
+    """
+    Map a logging level to the closest level name uvicorn accepts.
+    
+    Custom levels round down to the next named level; NOTSET (and anything
+    below trace) falls back to "info", uvicorn's default.
+    
+    Args:
+        level: Numeric logging level
+        
+    Returns:
+        str: uvicorn log level name
+    """
+    name = "info"
+    for candidate, value in _UVICORN_LOG_LEVELS:
+        if level >= value:
+            name = candidate
+    return name
+
+
+def run_web_server(host="127.0.0.1", port=8080, workers=1):
     """Run the web server with both MCP and web API"""
     if not WEB_DEPENDENCIES_AVAILABLE:
         logger.error("Web server dependencies not available!")
@@ -519,17 +685,41 @@ def run_web_server(host="127.0.0.1", port=8080):
         logger.error("Install with: pip install uvicorn starlette")
         sys.exit(1)
     
-    app = create_web_app()
-    
-    logger.info("=" * 80)
-    logger.info(f"Web Control Panel available at: http://{host}:{port}")
-    logger.info(f"MCP endpoints available at: http://{host}:{port}/api/...")
+    logger.info("\n".join([
+        _BAR,
+        f"Web Control Panel available at: http://{host}:{port}",
+        f"MCP endpoints available at: http://{host}:{port}/api/...",
+    ]))
     if host == "0.0.0.0":
-        logger.warning("⚠️  WARNING: Server is exposed to all network interfaces!")
-        logger.warning("⚠️  Consider using --host 127.0.0.1 for localhost-only access")
-    logger.info("=" * 80)
-    
-    uvicorn.run(app, host=host, port=port, log_level="info")
+        logger.warning("\n".join([
+            "⚠️  WARNING: Server is exposed to all network interfaces!",
+            "⚠️  Consider using --host 127.0.0.1 for localhost-only access",
+        ]))
+    logger.info(_BAR)
+    
+    # loop/http "auto" use uvloop and httptools when installed (the "web"
+    # extra). One worker is the default since the typical host is a small
+    # single-board computer. Extra workers are spawned by uvicorn from an
+    # import string and each builds its own app; the caches live on disk
+    # and sessions are signed cookies, but every worker keeps its own
+    # OctoPrint connection pool and status cache.
+    # uvicorn follows LOG_LEVEL too; above INFO that also drops the
+    # per-request access log lines
+    if workers > 1:
+        app = "server:create_web_app"
+        options = {"factory": True, "workers": workers}
+    else:
+        app = create_web_app()
+        options = {}
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        log_level=uvicorn_log_level(logging.getLogger().level),
+        loop="auto",
+        http="auto",
+        **options
+    )
 
 
 # ============================================================================
@@ -537,20 +727,24 @@ def run_web_server(host="127.0.0.1", port=8080):
 # ============================================================================
 
 if __name__ == "__main__":
-    # Register cleanup handlers
-    register_cleanup_handlers()
-    
     args = parse_arguments()
     startup_checks()
     
     # Check if we should run in web mode (with frontend)
     if args.web or args.transport == "streamable-http":
         logger.info("Starting server in web mode with control panel")
-        run_web_server(host=args.host, port=args.port)
+        run_web_server(host=args.host, port=args.port, workers=args.workers)
     else:
         # Log the transport being used
         logger.info(f"Starting MCP server with transport: {args.transport}")
         
+        # Web mode leaves signals to uvicorn, which drains in-flight
+        # requests before running the lifespan shutdown
+        register_cleanup_handlers()
+        
         # Create and run the MCP server
         mcp = create_mcp_server()
-        mcp.run(transport=args.transport)
+        try:
+            anyio.run(run_mcp_server, mcp, args.transport)
+        except KeyboardInterrupt:
+            logger.info("Server stopped")
@@ -6,6 +6,7 @@ from .printer_service import PrinterService
 from .workspace_service import WorkspaceService
 from .filesystem_service import FilesystemService
 from .terminal_service import TerminalService
+from .registry import ServiceRegistry, get_services
 
 __all__ = [
     "CADService",
@@ -14,4 +15,6 @@ __all__ = [
     "WorkspaceService",
     "FilesystemService",
     "TerminalService",
+    "ServiceRegistry",
+    "get_services",
 ]
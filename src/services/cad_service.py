@@ -1,13 +1,154 @@
 """CAD service for model creation and manipulation."""
 
+import os
 import time
-import uuid
+import secrets
+import asyncio
 import re
+import hashlib
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set
 
 from config import get_settings
-from utils import get_model_dir, run_command_async
+from utils import (
+    get_model_dir,
+    run_command_async,
+    cache_lookup,
+    cache_store,
+    atomic_write_text,
+    openscad_release_year,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# Camera rotation (rot_x, rot_y, rot_z in degrees) for each named preview view
+_VIEW_CAMERAS = {
+    "iso": "55,0,25",
+    "top": "0,0,0",
+    "bottom": "180,0,0",
+    "front": "90,0,0",
+    "back": "90,0,180",
+    "left": "90,0,270",
+    "right": "90,0,90",
+}
+
+# Special variables set for preview renders when the model leaves them alone.
+# A nonzero $fn overrides $fa/$fs, capping every circle at 8 segments: rough,
+# but enough to judge the shape; the $fa/$fs defaults (12 and 2) are left as
+# they are, being coarse already
+_PREVIEW_RESOLUTION = (("$fn", 8),)
+
+# A difference() statement at the start of a line, up to its opening brace
+_TOP_LEVEL_DIFFERENCE = re.compile(r"^difference\s*\(\s*\)\s*\{", re.MULTILINE)
+
+# An include <...> or use <...> statement in SCAD source
+_INCLUDE_OR_USE = re.compile(rb"^\s*(?:include|use)\s*<", re.MULTILINE)
+
+
+# Number of main.scad texts kept in memory by get_code
+_CODE_CACHE_SIZE = 128
+
+
+# Everything in a new model's main.scad after the description/timestamp header
+_SCAD_TEMPLATE_BODY = """
+// ============================================================================
+// PARAMETERS - Modify these to customize the model
+// ============================================================================
+
+// Basic dimensions
+width = 50;
+depth = 50;
+height = 30;
+
+// Feature toggles
+enable_base = true;
+enable_holes = false;
+
+// Advanced parameters
+wall_thickness = 2;
+corner_radius = 3;
+
+// ============================================================================
+// MODEL DEFINITION
+// ============================================================================
+
+module main_body() {
+    // Create the main body with rounded corners
+    hull() {
+        for (x = [corner_radius, width - corner_radius]) {
+            for (y = [corner_radius, depth - corner_radius]) {
+                translate([x, y, 0])
+                    cylinder(r = corner_radius, h = height, $fn = 30);
+            }
+        }
+    }
+}
+
+module holes() {
+    // Example: mounting holes in corners
+    hole_diameter = 3;
+    hole_inset = 8;
+    
+    for (x = [hole_inset, width - hole_inset]) {
+        for (y = [hole_inset, depth - hole_inset]) {
+            translate([x, y, -1])
+                cylinder(d = hole_diameter, h = height + 2, $fn = 20);
+        }
+    }
+}
+
+// ============================================================================
+// FINAL MODEL ASSEMBLY
+// ============================================================================
+
+difference() {
+    main_body();
+    
+    // Optionally add holes
+    if (enable_holes) {
+        holes();
+    }
+}
+
+// Add a base plate if enabled
+if (enable_base) {
+    translate([0, 0, -2])
+        cube([width, depth, 2]);
+}
+"""
+
+
+# (whole second, formatted local time) for the last timestamp produced
+_last_timestamp = (0, "")
+
+
+def _timestamp() -> str:
+    """Current local time as 'YYYY-MM-DD HH:MM:SS', formatted once per second."""
+    global _last_timestamp
+    now = int(time.time())
+    second, text = _last_timestamp
+    if now != second:
+        text = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+        # One tuple assignment, so threads never see a mismatched pair
+        _last_timestamp = (now, text)
+    return text
+
+
+@lru_cache(maxsize=64)
+def _parameter_pattern(param_names: frozenset) -> re.Pattern:
+    """Compile (and cache) one regex matching assignments to any of the given parameters."""
+    # Longest names first so a name is never shadowed by one of its prefixes
+    alternation = "|".join(
+        re.escape(name) for name in sorted(param_names, key=len, reverse=True)
+    )
+    return re.compile(rf'^(\s*)({alternation})\s*=\s*([^;]+);', re.MULTILINE)
 
 
 class CADService:
@@ -15,6 +156,19 @@ class CADService:
     
     def __init__(self):
         self.settings = get_settings()
+        # Full-resolution renders started by render_preview(quality="final")
+        self._background_renders: Set[asyncio.Task] = set()
+        # Caps preview renders across all requests; extra ones queue here
+        # instead of oversubscribing the CPU
+        self._render_slots = asyncio.Semaphore(self.settings.openscad_concurrency)
+        # Preview cache path -> outcome of the render currently producing it
+        self._inflight_renders: Dict[Path, asyncio.Future] = {}
+        # main.scad path -> (stat signature, text); the web API calls
+        # get_code from worker threads, hence the lock
+        self._code_cache: "OrderedDict[Path, tuple]" = OrderedDict()
+        self._code_cache_lock = threading.Lock()
+        # model_id -> lock serializing writes to that model's main.scad
+        self._model_locks: Dict[str, threading.Lock] = {}
     
     def create_model(self, description: str) -> Dict[str, Any]:
         """
@@ -28,7 +182,7 @@ class CADService:
         """
         try:
             # Generate unique model ID
-            model_id = str(uuid.uuid4())[:8]
+            model_id = secrets.token_hex(4)
             
             # Create model directory
             mdir = get_model_dir(model_id)
@@ -38,11 +192,11 @@ class CADService:
             scad_content = self._generate_template(description)
             
             scad_path = mdir / "main.scad"
-            scad_path.write_text(scad_content)
+            atomic_write_text(scad_path, scad_content)
             
             return {
                 "model_id": model_id,
-                "scad_path": str(scad_path.resolve()),
+                "scad_path": str(scad_path),
             }
             
         except Exception as e:
@@ -65,17 +219,36 @@ class CADService:
             mdir = get_model_dir(model_id)
             scad_path = mdir / "main.scad"
             
-            if not scad_path.exists():
+            try:
+                st = scad_path.stat()
+            except FileNotFoundError:
                 return {
                     "error": "Model not found",
                     "details": f"No main.scad found for model {model_id}"
                 }
             
-            scad_code = scad_path.read_text()
+            # Writes replace the file, so an unchanged inode/mtime/size
+            # means the cached text is current
+            signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._code_cache_lock:
+                cached = self._code_cache.get(scad_path)
+                if cached is not None and cached[0] == signature:
+                    self._code_cache.move_to_end(scad_path)
+                    scad_code = cached[1]
+                else:
+                    scad_code = None
+            
+            if scad_code is None:
+                scad_code = scad_path.read_text()
+                with self._code_cache_lock:
+                    self._code_cache[scad_path] = (signature, scad_code)
+                    self._code_cache.move_to_end(scad_path)
+                    if len(self._code_cache) > _CODE_CACHE_SIZE:
+                        self._code_cache.popitem(last=False)
             
             return {
                 "model_id": model_id,
-                "scad_path": str(scad_path.resolve()),
+                "scad_path": str(scad_path),
                 "scad_code": scad_code
             }
             
@@ -108,42 +281,50 @@ class CADService:
                     "details": f"No main.scad found for model {model_id}"
                 }
             
-            # Read existing content
-            content = scad_path.read_text()
-            
-            updated = []
-            changes = {}
-            not_found = []
-            
-            # Update each parameter
-            for param_name, param_value in parameters.items():
-                pattern = re.compile(
-                    rf'^(\s*)({re.escape(param_name)})\s*=\s*([^;]+);',
-                    re.MULTILINE
-                )
+            # Held from read to replace: web API calls run in worker threads,
+            # and concurrent edits of one model must not overwrite each other
+            with self._model_lock(model_id):
+                content = scad_path.read_text()
                 
-                match = pattern.search(content)
-                if match:
-                    old_value = match.group(3).strip()
-                    new_value = self._format_value(param_value)
-                    new_line = f'{match.group(1)}{param_name} = {new_value};'
-                    content = pattern.sub(new_line, content, count=1)
-                    
-                    updated.append(param_name)
-                    changes[param_name] = f"{old_value} -> {new_value}"
-                else:
-                    not_found.append(param_name)
+                changes = {}
+                
+                # Only the first assignment of each parameter is rewritten.
+                # Parameters are declared near the top while notes and update
+                # logs pile up at the end, so the scan stops as soon as every
+                # parameter has been seen and the edits are spliced in
+                if parameters:
+                    pieces = []
+                    pos = 0
+                    for match in _parameter_pattern(frozenset(parameters)).finditer(content):
+                        param_name = match.group(2)
+                        if param_name in changes:
+                            continue
+                        old_value = match.group(3).strip()
+                        new_value = self._format_value(parameters[param_name])
+                        changes[param_name] = f"{old_value} -> {new_value}"
+                        pieces.append(content[pos:match.start()])
+                        pieces.append(f'{match.group(1)}{param_name} = {new_value};')
+                        pos = match.end()
+                        if len(changes) == len(parameters):
+                            break
+                    pieces.append(content[pos:])
+                    content = "".join(pieces)
+                
+                updated = [name for name in parameters if name in changes]
+                not_found = [name for name in parameters if name not in changes]
+                changes = {name: changes[name] for name in updated}
+                
+                # Write updated content back to file
+                if updated:
+                    timestamp = _timestamp()
+                    mod_log = f"\n// Updated parameters at {timestamp}: {', '.join(updated)}\n"
+                    content = content + mod_log
+                    atomic_write_text(scad_path, content)
             
-            # Write updated content back to file
             if updated:
-                timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-                mod_log = f"\n// Updated parameters at {timestamp}: {', '.join(updated)}\n"
-                content = content + mod_log
-                scad_path.write_text(content)
-                
                 result = {
                     "model_id": model_id,
-                    "scad_path": str(scad_path.resolve()),
+                    "scad_path": str(scad_path),
                     "updated": updated,
                     "changes": changes
                 }
@@ -190,18 +371,20 @@ class CADService:
                     "details": f"No main.scad found for model {model_id}"
                 }
             
-            existing_content = scad_path.read_text()
             modification_note = (
                 f"\n// NOTE: {instruction}\n"
-                f"// Logged at: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"// Logged at: {_timestamp()}\n"
             )
             
-            modified_content = existing_content + modification_note
-            scad_path.write_text(modified_content)
+            # Pure append: a single O_APPEND write of the new bytes, so readers
+            # see the file with or without the note, never a rewrite. The lock
+            # keeps it from landing between update_parameters' read and replace
+            with self._model_lock(model_id), open(scad_path, "ab") as f:
+                f.write(modification_note.encode("utf-8"))
             
             return {
                 "model_id": model_id,
-                "scad_path": str(scad_path.resolve()),
+                "scad_path": str(scad_path),
                 "note": f"Added modification note: {instruction}",
                 "hint": "Use cad_update_parameters() to make actual parameter changes"
             }
@@ -219,16 +402,24 @@ class CADService:
         model_id: str,
         view: str = "iso",
         width: int = 800,
-        height: int = 600
+        height: int = 600,
+        quality: str = "fast"
     ) -> Dict[str, Any]:
         """
         Render a preview PNG of the model (async for efficiency).
         
+        The returned image is always a fast, low-resolution render. With
+        quality="final" a full-resolution render of the untouched source is
+        also started in the background; it appears as final_png_path (and in
+        list_previews) once finished, or list_previews reports it under
+        failed_finals if it fails.
+        
         Args:
             model_id: The model identifier
             view: View angle (iso, top, bottom, left, right, front, back)
             width: Image width in pixels
             height: Image height in pixels
+            quality: "fast" (default) or "final" to also start a full-resolution render
             
         Returns:
             dict: Contains model_id and png_path, or error information
@@ -240,6 +431,29 @@ class CADService:
                     "details": "Set the OPENSCAD_BIN environment variable"
                 }
             
+            if view not in _VIEW_CAMERAS:
+                return {
+                    "error": f"Invalid view: {view}",
+                    "details": f"Valid views: {', '.join(_VIEW_CAMERAS)}"
+                }
+            
+            if quality not in ("fast", "final"):
+                return {
+                    "error": f"Invalid quality: {quality}",
+                    "details": "Valid qualities: fast, final"
+                }
+            
+            # The web API may pass sizes as strings such as "800"
+            try:
+                width, height = int(width), int(height)
+            except (TypeError, ValueError):
+                width = height = 0
+            if width <= 0 or height <= 0:
+                return {
+                    "error": "Invalid image size",
+                    "details": "width and height must be positive integers"
+                }
+            
             mdir = get_model_dir(model_id)
             scad_path = mdir / "main.scad"
             
@@ -249,40 +463,38 @@ class CADService:
                     "details": f"No main.scad found for model {model_id}"
                 }
             
-            # Generate unique preview filename
-            timestamp = int(time.time() * 1000)
-            png_filename = f"preview_{timestamp}.png"
+            # Generate unique preview filename (the view keeps concurrent
+            # multi-view renders from colliding)
+            timestamp = time.time_ns()
+            png_filename = f"preview_{timestamp}_{view}.png"
             png_path = mdir / png_filename
             
-            # Build OpenSCAD command
-            cmd = [
-                self.settings.openscad_bin,
-                "-o", str(png_path),
-                f"--imgsize={width},{height}",
-                "--render",
-                str(scad_path)
-            ]
-            
-            # Execute OpenSCAD asynchronously
-            result = await run_command_async(cmd, timeout=120, cwd=mdir)
-            
-            if not result["success"]:
-                return {
-                    "error": "OpenSCAD rendering failed",
-                    "details": result["stderr"],
-                    "stdout": result["stdout"]
-                }
-            
-            if not png_path.exists():
-                return {
-                    "error": "Preview file not generated",
-                    "details": "OpenSCAD completed but no PNG was created"
-                }
+            scad_bytes = scad_path.read_bytes()
+            result = await self._render_png(
+                mdir, scad_bytes, png_path, view, width, height, "fast"
+            )
+            if "error" in result:
+                return result
             
-            return {
+            response = {
                 "model_id": model_id,
-                "png_path": str(png_path.resolve())
+                "png_path": str(png_path)
             }
+            if result["cached"]:
+                response["cached"] = True
+            
+            if quality == "final":
+                final_path = mdir / f"preview_{timestamp}_{view}_final.png"
+                task = asyncio.create_task(self._render_final(
+                    mdir, scad_bytes, final_path, view, width, height
+                ))
+                # Hold a reference so the task is not garbage collected mid-render
+                self._background_renders.add(task)
+                task.add_done_callback(self._background_renders.discard)
+                response["final_png_path"] = str(final_path)
+                response["final_status"] = "rendering"
+            
+            return response
             
         except ValueError as e:
             return {"error": str(e)}
@@ -292,6 +504,217 @@ class CADService:
                 "details": str(e)
             }
     
+    async def _render_final(
+        self,
+        mdir: Path,
+        scad_bytes: bytes,
+        final_path: Path,
+        view: str,
+        width: int,
+        height: int
+    ) -> None:
+        """
+        Background full-resolution render started by render_preview.
+        
+        Nobody awaits this task, so a failure is logged and recorded in an
+        error file next to final_path for list_previews to report.
+        """
+        try:
+            result = await self._render_png(
+                mdir, scad_bytes, final_path, view, width, height, "final"
+            )
+        except Exception as e:
+            result = {"error": "Failed to render preview", "details": str(e)}
+        if "error" not in result:
+            return
+        
+        message = result["error"]
+        if result.get("details"):
+            message = f"{message}: {str(result['details']).strip()}"
+        logger.error(f"Final render of {final_path} failed: {message}")
+        try:
+            atomic_write_text(final_path.with_suffix(".error.txt"), message)
+        except OSError as e:
+            logger.error(f"Could not record failed render of {final_path}: {e}")
+    
+    async def _render_png(
+        self,
+        mdir: Path,
+        scad_bytes: bytes,
+        png_path: Path,
+        view: str,
+        width: int,
+        height: int,
+        quality: str
+    ) -> Dict[str, Any]:
+        """
+        Render SCAD source to png_path, going through the preview cache.
+        
+        "fast" renders a low-resolution rewrite of the source (see
+        _rewrite_for_preview); "final" renders the source unchanged.
+        
+        Returns:
+            dict: Contains cached (bool), or error information
+        """
+        # Identical SCAD source (and included files) + view + size + quality
+        # always renders the same PNG, so serve repeats from the
+        # content-addressed cache
+        cache_path = self._preview_cache_path(
+            scad_bytes, view, width, height, quality, mdir
+        )
+        if cache_lookup(cache_path, png_path):
+            return {"cached": True}
+        
+        # An identical render already in progress will fill the same cache
+        # entry; wait for it instead of starting a second OpenSCAD process
+        pending = self._inflight_renders.get(cache_path)
+        if pending is not None:
+            shared = await pending
+            if shared is not None and "error" in shared:
+                return shared
+            if cache_lookup(cache_path, png_path):
+                return {"cached": True}
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_renders[cache_path] = future
+        result = None
+        try:
+            result = await self._run_openscad_png(
+                mdir, scad_bytes, png_path, view, width, height, quality
+            )
+            if "error" not in result:
+                cache_store(png_path, cache_path, self.settings.preview_cache_size)
+            return result
+        finally:
+            if self._inflight_renders.get(cache_path) is future:
+                del self._inflight_renders[cache_path]
+            # None (interrupted render) makes waiters render for themselves
+            future.set_result(result)
+    
+    async def _run_openscad_png(
+        self,
+        mdir: Path,
+        scad_bytes: bytes,
+        png_path: Path,
+        view: str,
+        width: int,
+        height: int,
+        quality: str
+    ) -> Dict[str, Any]:
+        """
+        Run OpenSCAD to render SCAD source to png_path (no caching).
+        
+        Returns:
+            dict: Contains cached (always False), or error information
+        """
+        if quality == "fast":
+            render_scad = self._rewrite_for_preview(
+                scad_bytes.decode("utf-8", errors="replace")
+            ).encode("utf-8")
+        else:
+            render_scad = scad_bytes
+        
+        # OpenSCAD runs in the model directory, so relative include/use
+        # statements resolve the same whether the source is piped on stdin
+        # or written next to main.scad
+        if await self._openscad_reads_stdin():
+            render_scad_path = None
+            input_name = "-"
+        else:
+            render_scad_path = mdir / f".{png_path.stem}.scad"
+            render_scad_path.write_bytes(render_scad)
+            input_name = str(render_scad_path)
+        
+        # Build OpenSCAD command
+        cmd = [
+            self.settings.openscad_bin,
+            "-o", str(png_path),
+            f"--imgsize={width},{height}",
+            f"--camera=0,0,0,{_VIEW_CAMERAS[view]},0",
+            "--autocenter",
+            "--viewall",
+            # Fast previews use the OpenCSG preview renderer, which skips the
+            # full CGAL evaluation that final renders (and slicing) need
+            "--preview" if quality == "fast" else "--render",
+            input_name
+        ]
+        
+        # Execute OpenSCAD asynchronously (timeout from settings.command_timeout)
+        try:
+            async with self._render_slots:
+                result = await run_command_async(
+                    cmd,
+                    cwd=mdir,
+                    input=render_scad if render_scad_path is None else None,
+                    keep_tail=True
+                )
+        finally:
+            if render_scad_path is not None:
+                render_scad_path.unlink(missing_ok=True)
+        
+        if not result["success"]:
+            return {
+                "error": "OpenSCAD rendering failed",
+                "details": result["stderr"],
+                "stdout": result["stdout"]
+            }
+        
+        if not png_path.exists():
+            return {
+                "error": "Preview file not generated",
+                "details": "OpenSCAD completed but no PNG was created"
+            }
+        
+        return {"cached": False}
+    
+    async def render_previews(
+        self,
+        model_id: str,
+        views: List[str],
+        width: int = 800,
+        height: int = 600
+    ) -> Dict[str, Any]:
+        """
+        Render preview PNGs of the model from several views concurrently.
+        
+        Each view is a separate OpenSCAD process, so renders run in parallel
+        (bounded by OPENSCAD_CONCURRENCY) instead of one after another.
+        
+        Args:
+            model_id: The model identifier
+            views: View angles to render (see render_preview)
+            width: Image width in pixels
+            height: Image height in pixels
+            
+        Returns:
+            dict: Contains model_id, previews mapping view to png_path, and
+                errors mapping view to error information for failed views
+        """
+        unique_views = list(dict.fromkeys(views))
+        
+        # The service-wide render slots already cap how many OpenSCAD
+        # processes run at once
+        results = await asyncio.gather(*(
+            self.render_preview(model_id, view, width, height)
+            for view in unique_views
+        ))
+        
+        previews = {}
+        errors = {}
+        for view, result in zip(unique_views, results):
+            if "error" in result:
+                errors[view] = result
+            else:
+                previews[view] = result["png_path"]
+        
+        response = {
+            "model_id": model_id,
+            "previews": previews
+        }
+        if errors:
+            response["errors"] = errors
+        return response
+    
     def list_previews(self, model_id: str) -> Dict[str, Any]:
         """
         List available preview images for a model.
@@ -300,28 +723,47 @@ class CADService:
             model_id: The model identifier
             
         Returns:
-            dict: Contains model_id and list of previews with file and mtime
+            dict: Contains model_id and list of previews with file and mtime,
+                plus failed_finals (file and error) for background
+                full-resolution renders that failed, or error information
         """
         try:
             mdir = get_model_dir(model_id)
             
-            if not mdir.exists():
+            # One directory pass; a missing directory surfaces as the error
+            previews = []
+            failed = []
+            try:
+                with os.scandir(mdir) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith("preview_"):
+                            continue
+                        if entry.name.endswith(".png"):
+                            previews.append(
+                                {"file": entry.name, "mtime": entry.stat().st_mtime}
+                            )
+                        elif entry.name.endswith("_final.error.txt"):
+                            failed.append(entry.name)
+            except FileNotFoundError:
                 return {
                     "error": "Model not found",
                     "details": f"Model directory does not exist for {model_id}"
                 }
+            previews.sort(key=lambda preview: preview["file"])
             
-            previews = []
-            for png_file in sorted(mdir.glob("preview_*.png")):
-                previews.append({
-                    "file": png_file.name,
-                    "mtime": png_file.stat().st_mtime
-                })
-            
-            return {
+            response = {
                 "model_id": model_id,
                 "previews": previews
             }
+            if failed:
+                response["failed_finals"] = [
+                    {
+                        "file": name[:-len(".error.txt")] + ".png",
+                        "error": (mdir / name).read_text(errors="replace")
+                    }
+                    for name in sorted(failed)
+                ]
+            return response
             
         except ValueError as e:
             return {"error": str(e)}
@@ -331,6 +773,95 @@ class CADService:
                 "details": str(e)
             }
     
+    async def _openscad_reads_stdin(self) -> bool:
+        """Check whether the configured OpenSCAD accepts '-' as input file."""
+        # Reading the source from stdin was added in OpenSCAD 2021.01
+        return await openscad_release_year(self.settings.openscad_bin) >= 2021
+    
+    def _preview_cache_path(
+        self,
+        scad_bytes: bytes,
+        view: str,
+        width: int,
+        height: int,
+        quality: str = "fast",
+        mdir: Optional[Path] = None
+    ) -> Path:
+        """
+        Get the cache entry path for a rendered preview of the given source.
+        
+        When the source includes or uses other files and mdir is given, the
+        key also covers the model directory's other .scad files, so editing
+        an included file invalidates the cached PNG.
+        """
+        hasher = hashlib.blake2b(
+            scad_bytes + view.encode() + struct.pack("<II", width, height) + quality.encode(),
+            digest_size=16
+        )
+        if mdir is not None and _INCLUDE_OR_USE.search(scad_bytes):
+            hasher.update(self._scad_library_signature(mdir))
+        return self.settings.preview_cache_dir / f"{hasher.hexdigest()}.png"
+    
+    @staticmethod
+    def _scad_library_signature(mdir: Path) -> bytes:
+        """Name, mtime and size of every .scad file under mdir except main.scad."""
+        # Any rewrite of a file changes its mtime; dotfiles are the
+        # renderer's own temporary sources
+        entries = []
+        for root, dirs, files in os.walk(mdir):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            for name in files:
+                if not name.endswith(".scad") or name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                if path == os.path.join(mdir, "main.scad"):
+                    continue
+                st = os.stat(path)
+                entries.append(f"{os.path.relpath(path, mdir)}:{st.st_mtime_ns}:{st.st_size}")
+        return "\n".join(sorted(entries)).encode()
+    
+    def _model_lock(self, model_id: str) -> threading.Lock:
+        """Get the lock serializing writes to a model's main.scad."""
+        # setdefault is atomic, so racing threads always share one lock
+        return self._model_locks.setdefault(model_id, threading.Lock())
+    
+    @staticmethod
+    def _rewrite_for_preview(scad_code: str) -> str:
+        """
+        Rewrite SCAD source for a fast preview render.
+        
+        Lowers curve resolution unless the model sets it explicitly, and wraps
+        top-level difference() blocks that contain loops in render() so the
+        subtree is evaluated once. Only used for previews; slicing always
+        renders the untouched source.
+        """
+        header = "".join(
+            f"{name} = {value};\n"
+            for name, value in _PREVIEW_RESOLUTION
+            if not re.search(rf"^\s*\{name}\s*=", scad_code, re.MULTILINE)
+        )
+        
+        parts = []
+        last = 0
+        for match in _TOP_LEVEL_DIFFERENCE.finditer(scad_code):
+            body_start = match.end()
+            depth = 1
+            pos = body_start
+            while depth and pos < len(scad_code):
+                char = scad_code[pos]
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                pos += 1
+            if re.search(r"\bfor\s*\(", scad_code[body_start:pos]):
+                parts.append(scad_code[last:match.start()])
+                parts.append("render() ")
+                last = match.start()
+        parts.append(scad_code[last:])
+        
+        return header + "".join(parts)
+    
     @staticmethod
     def _format_value(value: Any) -> str:
         """Format a Python value for OpenSCAD."""
@@ -346,71 +877,5 @@ class CADService:
     @staticmethod
     def _generate_template(description: str) -> str:
         """Generate an OpenSCAD template."""
-        return f"""// {description}
-// Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
-
-// ============================================================================
-// PARAMETERS - Modify these to customize the model
-// ============================================================================
-
-// Basic dimensions
-width = 50;
-depth = 50;
-height = 30;
-
-// Feature toggles
-enable_base = true;
-enable_holes = false;
-
-// Advanced parameters
-wall_thickness = 2;
-corner_radius = 3;
-
-// ============================================================================
-// MODEL DEFINITION
-// ============================================================================
-
-module main_body() {{
-    // Create the main body with rounded corners
-    hull() {{
-        for (x = [corner_radius, width - corner_radius]) {{
-            for (y = [corner_radius, depth - corner_radius]) {{
-                translate([x, y, 0])
-                    cylinder(r = corner_radius, h = height, $fn = 30);
-            }}
-        }}
-    }}
-}}
-
-module holes() {{
-    // Example: mounting holes in corners
-    hole_diameter = 3;
-    hole_inset = 8;
-    
-    for (x = [hole_inset, width - hole_inset]) {{
-        for (y = [hole_inset, depth - hole_inset]) {{
-            translate([x, y, -1])
-                cylinder(d = hole_diameter, h = height + 2, $fn = 20);
-        }}
-    }}
-}}
-
-// ============================================================================
-// FINAL MODEL ASSEMBLY
-// ============================================================================
-
-difference() {{
-    main_body();
-    
-    // Optionally add holes
-    if (enable_holes) {{
-        holes();
-    }}
-}}
-
-// Add a base plate if enabled
-if (enable_base) {{
-    translate([0, 0, -2])
-        cube([width, depth, 2]);
-}}
-"""
+        header = f"// {description}\n// Generated: {_timestamp()}\n"
+        return header + _SCAD_TEMPLATE_BODY
@@ -1,6 +1,9 @@
 """Filesystem service for file and directory operations."""
 
 import os
+import base64
+from stat import S_ISREG
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import mimetypes
@@ -8,6 +11,22 @@ import mimetypes
 from config import get_settings
 
 
+# Characters encoded and written per write() call in write_file
+_WRITE_CHUNK_CHARS = 1 << 20
+
+
+@lru_cache(maxsize=1024)
+def _guess_mime_type(suffixes: str) -> Optional[str]:
+    """Guess a MIME type from a file's trailing suffixes (e.g. ".tar.gz")."""
+    return mimetypes.guess_type(f"file{suffixes}")[0]
+
+
+def _mime_type(path: Path) -> Optional[str]:
+    """Guess a path's MIME type, cached per extension."""
+    # guess_type looks at no more than an encoding suffix plus a type suffix
+    return _guess_mime_type("".join(path.suffixes[-2:]))
+
+
 class FilesystemService:
     """Service for filesystem operations with security controls."""
     
@@ -20,32 +39,35 @@ class FilesystemService:
             Path.home(),  # User's home directory
             Path.cwd(),  # Current working directory
         ]
+        # Resolved once; only the checked path needs resolving per call
+        self._resolved_allowed_dirs = [d.resolve() for d in self.allowed_base_dirs]
     
-    def _is_path_allowed(self, path: Path) -> bool:
+    def _resolve_allowed(self, path: Path) -> Optional[Path]:
         """
-        Check if a path is within allowed directories.
+        Resolve a path and check that it is within allowed directories.
         
-        This prevents access to sensitive system directories.
+        This prevents access to sensitive system directories. The resolved
+        path is returned so callers can report it without resolving again.
         
         Args:
             path: Path to check
             
         Returns:
-            bool: True if path is allowed, False otherwise
+            Path: The resolved path if allowed, None otherwise
         """
         try:
+            # The target is always resolved, so a symlink inside an allowed
+            # directory cannot point the operation outside of it
             resolved_path = path.resolve()
             # Check if path is within any allowed base directory
-            for allowed_dir in self.allowed_base_dirs:
-                try:
-                    resolved_allowed = allowed_dir.resolve()
-                    resolved_path.relative_to(resolved_allowed)
-                    return True
-                except ValueError:
-                    continue
-            return False
+            if any(
+                resolved_path.is_relative_to(allowed_dir)
+                for allowed_dir in self._resolved_allowed_dirs
+            ):
+                return resolved_path
+            return None
         except Exception:
-            return False
+            return None
     
     def read_file(self, file_path: str, encoding: str = "utf-8") -> Dict[str, Any]:
         """
@@ -56,51 +78,58 @@ class FilesystemService:
             encoding: Text encoding (default: utf-8). Use 'binary' for binary files.
             
         Returns:
-            dict: Contains file content and metadata
+            dict: Contains file content (content, or base64 in content_base64
+                for binary reads) and metadata
         """
         try:
             path = Path(file_path).expanduser()
             
-            if not self._is_path_allowed(path):
+            resolved = self._resolve_allowed(path)
+            if resolved is None:
                 return {
                     "error": "Access denied",
                     "details": "Path is outside allowed directories"
                 }
             
-            if not path.exists():
+            # Open first and inspect the open file: one open() and one
+            # fstat() replace separate exists/is_file/stat lookups.
+            # O_NONBLOCK keeps opening a FIFO from hanging before the check
+            try:
+                fd = os.open(resolved, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+            except FileNotFoundError:
                 return {
                     "error": "File not found",
                     "details": f"File does not exist: {file_path}"
                 }
             
-            if not path.is_file():
+            st = os.fstat(fd)
+            if not S_ISREG(st.st_mode):
+                os.close(fd)
                 return {
                     "error": "Not a file",
                     "details": f"Path is not a file: {file_path}"
                 }
             
-            # Get file metadata
-            stat = path.stat()
-            mime_type, _ = mimetypes.guess_type(str(path))
+            binary = encoding == "binary"
+            with open(fd, "rb" if binary else "r", encoding=None if binary else encoding) as f:
+                content = f.read()
+            
+            mime_type = _mime_type(path)
             
-            # Read file content
-            if encoding == "binary":
-                with open(path, "rb") as f:
-                    content = f.read()
+            if binary:
                 return {
-                    "path": str(path.resolve()),
-                    "size": stat.st_size,
+                    "path": str(resolved),
+                    "size": st.st_size,
                     "mime_type": mime_type or "application/octet-stream",
                     "encoding": "binary",
-                    "content_base64": content.hex(),  # Return as hex for JSON serialization
+                    # Base64 grows the payload by 4/3 where hex doubled it
+                    "content_base64": base64.b64encode(content).decode("ascii"),
                     "is_binary": True
                 }
             else:
-                with open(path, "r", encoding=encoding) as f:
-                    content = f.read()
                 return {
-                    "path": str(path.resolve()),
-                    "size": stat.st_size,
+                    "path": str(resolved),
+                    "size": st.st_size,
                     "mime_type": mime_type or "text/plain",
                     "encoding": encoding,
                     "content": content,
@@ -140,7 +169,8 @@ class FilesystemService:
         try:
             path = Path(file_path).expanduser()
             
-            if not self._is_path_allowed(path):
+            resolved = self._resolve_allowed(path)
+            if resolved is None:
                 return {
                     "error": "Access denied",
                     "details": "Path is outside allowed directories"
@@ -150,13 +180,15 @@ class FilesystemService:
             if create_dirs and not path.parent.exists():
                 path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write file
+            # Write in slices so only one slice is encoded at a time, rather
+            # than an encoded copy of the whole content
             with open(path, "w", encoding=encoding) as f:
-                f.write(content)
+                for start in range(0, len(content), _WRITE_CHUNK_CHARS):
+                    f.write(content[start:start + _WRITE_CHUNK_CHARS])
             
             return {
                 "success": True,
-                "path": str(path.resolve()),
+                "path": str(resolved),
                 "size": len(content),
                 "message": "File written successfully"
             }
@@ -187,7 +219,8 @@ class FilesystemService:
         try:
             path = Path(dir_path).expanduser()
             
-            if not self._is_path_allowed(path):
+            resolved = self._resolve_allowed(path)
+            if resolved is None:
                 return {
                     "error": "Access denied",
                     "details": "Path is outside allowed directories"
@@ -206,48 +239,50 @@ class FilesystemService:
                 }
             
             entries = []
-            
-            if recursive:
-                # Recursive listing
-                for item in path.rglob("*"):
-                    if not show_hidden and item.name.startswith("."):
-                        continue
-                    
-                    try:
-                        stat = item.stat()
-                        entries.append({
-                            "name": item.name,
-                            "path": str(item.relative_to(path)),
-                            "absolute_path": str(item.resolve()),
-                            "type": "directory" if item.is_dir() else "file",
-                            "size": stat.st_size if item.is_file() else 0,
-                            "modified": stat.st_mtime
-                        })
-                    except Exception:
-                        # Skip items we can't access
-                        continue
-            else:
-                # Non-recursive listing
-                for item in sorted(path.iterdir()):
-                    if not show_hidden and item.name.startswith("."):
-                        continue
-                    
+            # Entry paths are joined onto the resolved directory rather than
+            # each paying for a realpath() of its own
+            base = str(resolved)
+            
+            # DirEntry answers is_dir()/is_file() from the directory listing
+            # and caches its stat(), so an entry costs at most one syscall.
+            # Symlinked directories are listed but not descended into
+            pending = [""]
+            while pending:
+                rel_dir = pending.pop()
+                try:
+                    with os.scandir(os.path.join(base, rel_dir)) as scan:
+                        dir_entries = sorted(scan, key=lambda entry: entry.name)
+                except OSError:
+                    if not rel_dir:
+                        raise
+                    # Skip subdirectories we can't access
+                    continue
+                
+                for entry in dir_entries:
+                    rel_path = os.path.join(rel_dir, entry.name)
                     try:
-                        stat = item.stat()
+                        is_dir = entry.is_dir()
+                        if recursive and is_dir and not entry.is_symlink():
+                            pending.append(rel_path)
+                        
+                        if not show_hidden and entry.name.startswith("."):
+                            continue
+                        
+                        stat = entry.stat()
                         entries.append({
-                            "name": item.name,
-                            "path": str(item.relative_to(path)),
-                            "absolute_path": str(item.resolve()),
-                            "type": "directory" if item.is_dir() else "file",
-                            "size": stat.st_size if item.is_file() else 0,
+                            "name": entry.name,
+                            "path": rel_path,
+                            "absolute_path": os.path.join(base, rel_path),
+                            "type": "directory" if is_dir else "file",
+                            "size": stat.st_size if entry.is_file() else 0,
                             "modified": stat.st_mtime
                         })
-                    except Exception:
+                    except OSError:
                         # Skip items we can't access
                         continue
             
             return {
-                "directory": str(path.resolve()),
+                "directory": base,
                 "count": len(entries),
                 "entries": entries
             }
@@ -272,7 +307,8 @@ class FilesystemService:
         try:
             path = Path(dir_path).expanduser()
             
-            if not self._is_path_allowed(path):
+            resolved = self._resolve_allowed(path)
+            if resolved is None:
                 return {
                     "error": "Access denied",
                     "details": "Path is outside allowed directories"
@@ -282,7 +318,7 @@ class FilesystemService:
                 if path.is_dir():
                     return {
                         "success": True,
-                        "path": str(path.resolve()),
+                        "path": str(resolved),
                         "message": "Directory already exists"
                     }
                 else:
@@ -295,7 +331,7 @@ class FilesystemService:
             
             return {
                 "success": True,
-                "path": str(path.resolve()),
+                "path": str(resolved),
                 "message": "Directory created successfully"
             }
                 
@@ -319,7 +355,8 @@ class FilesystemService:
         try:
             path = Path(path_str).expanduser()
             
-            if not self._is_path_allowed(path):
+            resolved = self._resolve_allowed(path)
+            if resolved is None:
                 return {
                     "error": "Access denied",
                     "details": "Path is outside allowed directories"
@@ -389,7 +426,8 @@ class FilesystemService:
         try:
             path = Path(path_str).expanduser()
             
-            if not self._is_path_allowed(path):
+            resolved = self._resolve_allowed(path)
+            if resolved is None:
                 return {
                     "error": "Access denied",
                     "details": "Path is outside allowed directories"
@@ -402,11 +440,11 @@ class FilesystemService:
                 }
             
             stat = path.stat()
-            mime_type, _ = mimetypes.guess_type(str(path))
+            mime_type = _mime_type(path)
             
             return {
                 "exists": True,
-                "path": str(path.resolve()),
+                "path": str(resolved),
                 "type": "directory" if path.is_dir() else "file",
                 "size": stat.st_size,
                 "modified": stat.st_mtime,
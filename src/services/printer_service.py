@@ -1,12 +1,21 @@
 """Printer service for OctoPrint integration."""
 
-import json
-from typing import Dict, Any, Optional
+import os
+import asyncio
+from typing import Dict, Any, Optional, Tuple
 import httpx
+from pydantic_core import from_json, to_json
 
 from config import get_settings
 from utils import get_model_dir
 
+# httpx streams multipart file bodies from disk in chunks, so uploads are
+# bounded by network speed rather than memory; give them room to finish
+_UPLOAD_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+
+# Sent with pre-serialized JSON bodies (httpx only adds it for json=)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class PrinterService:
     """Service for 3D printer operations via OctoPrint."""
@@ -15,13 +24,30 @@ class PrinterService:
         self.settings = get_settings()
         # Use httpx.AsyncClient for better performance with connection pooling
         self._client: Optional[httpx.AsyncClient] = None
+        # Last (ETag, raw body) per GET path, for conditional status polling.
+        # The bytes are parsed again on each 304, so callers that modify the
+        # returned dict never alter the cached response
+        self._etag_cache: Dict[str, Tuple[str, bytes]] = {}
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create async HTTP client with connection pooling."""
         if self._client is None:
             self._client = httpx.AsyncClient(
+                base_url=self.settings.octoprint_url.rstrip('/'),
                 timeout=30.0,
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+                # Retry failed connects (e.g. a stale keep-alive socket after
+                # OctoPrint restarts) instead of surfacing them to the caller.
+                # Idle connections are kept for a minute rather than httpx's
+                # 5 seconds, so occasional status polls skip the TCP handshake
+                transport=httpx.AsyncHTTPTransport(
+                    retries=2,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=5,
+                        max_connections=10,
+                        keepalive_expiry=60.0
+                    )
+                ),
+                headers={"X-Api-Key": self.settings.octoprint_api_key}
             )
         return self._client
     
@@ -45,8 +71,11 @@ class PrinterService:
                     "details": "Set the OCTOPRINT_API_KEY environment variable"
                 }
             
-            job_status = await self._get("/api/job")
-            printer_status = await self._get("/api/printer")
+            # Both requests go out together over the pooled client
+            job_status, printer_status = await asyncio.gather(
+                self._get("/api/job"),
+                self._get("/api/printer")
+            )
             
             return {
                 "job": job_status,
@@ -67,7 +96,10 @@ class PrinterService:
             model_id: The model identifier
             
         Returns:
-            dict: Contains upload_result and start_result from OctoPrint
+            dict: Contains upload_result from OctoPrint and start_result
+                  (whether OctoPrint selected the file and started the job:
+                  true, false, or "unknown" if OctoPrint did not say), or
+                  error information if OctoPrint reports it did not start
         """
         try:
             if not self.settings.octoprint_api_key:
@@ -85,12 +117,25 @@ class PrinterService:
                     "details": f"No model.gcode found for model {model_id}. Run slicer_slice_model first."
                 }
             
-            # Upload file to OctoPrint
+            # Upload file to OctoPrint. The select/print form fields make
+            # OctoPrint start the job as soon as the upload lands, saving a
+            # separate select request (and its round-trip) afterwards.
             filename = f"{model_id}_model.gcode"
+            start_payload = {
+                "select": "true",
+                "print": "true"
+            }
             
             with open(gcode_path, 'rb') as f:
+                # httpx reads the file synchronously as it sends; asking the
+                # kernel to read ahead now lets the disk work overlap the
+                # upload, so those reads are served from the page cache
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
                 files = {'file': (filename, f, 'application/octet-stream')}
-                upload_result = await self._post("/api/files/local", files=files)
+                upload_result = await self._post(
+                    "/api/files/local", payload=start_payload, files=files
+                )
             
             if "error" in upload_result:
                 return {
@@ -99,14 +144,22 @@ class PrinterService:
                     "error": "Upload failed"
                 }
             
-            # Start the print job
-            start_payload = {
-                "command": "select",
-                "print": True
+            # OctoPrint stores the file even when it cannot start the job
+            # (printer offline or busy) and reports that in its reply; older
+            # versions leave these keys out, which is reported as "unknown"
+            start_result = {
+                "select": upload_result.get("effectiveSelect", "unknown"),
+                "print": upload_result.get("effectivePrint", "unknown")
             }
-            
-            file_path = f"local/{filename}"
-            start_result = await self._post(f"/api/files/{file_path}", payload=start_payload)
+            if start_result["print"] is False:
+                return {
+                    "model_id": model_id,
+                    "upload_result": upload_result,
+                    "start_result": start_result,
+                    "error": "Print not started",
+                    "details": "OctoPrint stored the file but did not start the job "
+                               "(is the printer connected and idle?)"
+                }
             
             return {
                 "model_id": model_id,
@@ -161,20 +214,32 @@ class PrinterService:
             return {"error": "OCTOPRINT_API_KEY not configured"}
         
         try:
-            url = f"{self.settings.octoprint_url.rstrip('/')}{path}"
-            headers = {"X-Api-Key": self.settings.octoprint_api_key}
+            headers = {}
+            
+            cached = self._etag_cache.get(path)
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
             
             client = await self._get_client()
-            response = await client.get(url, headers=headers)
+            response = await client.get(path, headers=headers)
+            
+            if response.status_code == 304 and cached is not None:
+                return from_json(cached[1])
             
             if response.status_code == 204:
                 return {"status": 204}
             
             if response.status_code in (200, 201):
                 try:
-                    return response.json()
-                except json.JSONDecodeError:
+                    # pydantic_core (installed with mcp) parses in native code
+                    data = from_json(response.content)
+                except ValueError:
                     return {"status": response.status_code, "body": response.text}
+                
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._etag_cache[path] = (etag, response.content)
+                return data
             
             return {
                 "error": f"HTTP {response.status_code}",
@@ -195,24 +260,25 @@ class PrinterService:
             return {"error": "OCTOPRINT_API_KEY not configured"}
         
         try:
-            url = f"{self.settings.octoprint_url.rstrip('/')}{path}"
-            headers = {"X-Api-Key": self.settings.octoprint_api_key}
-            
             client = await self._get_client()
             
             if files:
-                response = await client.post(url, headers=headers, files=files, data=payload)
+                response = await client.post(
+                    path, files=files, data=payload, timeout=_UPLOAD_TIMEOUT
+                )
             else:
-                headers["Content-Type"] = "application/json"
-                response = await client.post(url, headers=headers, json=payload)
+                # Serialize once, in native code, straight to the request body
+                response = await client.post(
+                    path, content=to_json(payload), headers=_JSON_HEADERS
+                )
             
             if response.status_code == 204:
                 return {"status": 204}
             
             if response.status_code in (200, 201):
                 try:
-                    return response.json()
-                except json.JSONDecodeError:
+                    return from_json(response.content)
+                except ValueError:
                     return {"status": response.status_code, "body": response.text}
             
             return {
@@ -0,0 +1,43 @@
+"""Shared service instances."""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .cad_service import CADService
+from .slicer_service import SlicerService
+from .printer_service import PrinterService
+from .workspace_service import WorkspaceService
+from .filesystem_service import FilesystemService
+from .terminal_service import TerminalService
+
+
+@dataclass(slots=True)
+class ServiceRegistry:
+    """One instance of each service, shared by the MCP tools and the web API."""
+    cad: CADService
+    slicer: SlicerService
+    printer: PrinterService
+    workspace: WorkspaceService
+    filesystem: FilesystemService
+    terminal: TerminalService
+
+
+@lru_cache(maxsize=1)
+def get_services() -> ServiceRegistry:
+    """
+    Get the shared service instances, creating them on first use.
+    
+    Sharing one set means the MCP tools and web API use the same HTTP
+    connection pool, preview state and caches.
+    
+    Returns:
+        ServiceRegistry: The process-wide services
+    """
+    return ServiceRegistry(
+        cad=CADService(),
+        slicer=SlicerService(),
+        printer=PrinterService(),
+        workspace=WorkspaceService(),
+        filesystem=FilesystemService(),
+        terminal=TerminalService(),
+    )
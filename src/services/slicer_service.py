@@ -1,10 +1,19 @@
 """Slicer service for G-code generation."""
 
+import os
+import hashlib
+import tempfile
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from config import get_settings
-from utils import get_model_dir, run_command_async, run_command_safe
+from utils import (
+    get_model_dir,
+    run_command_async,
+    cache_lookup,
+    cache_store,
+    openscad_release_year,
+)
 
 
 class SlicerService:
@@ -69,11 +78,38 @@ class SlicerService:
                     "details": "OpenSCAD completed but no STL was created"
                 }
             
-            # Step 2: Slice STL to G-code
+            # Step 2: Slice STL to G-code, unless this exact STL was already
+            # sliced with the same slicer, profile and arguments
             gcode_path = mdir / "model.gcode"
-            slice_result = await self._slice_to_gcode(
-                stl_path, gcode_path, profile, extra_args, mdir
-            )
+            cache_path = self._gcode_cache_path(stl_path, profile, extra_args)
+            if cache_lookup(cache_path, gcode_path):
+                return {
+                    "model_id": model_id,
+                    "gcode_path": str(gcode_path),
+                    "slicer_stdout": "",
+                    "slicer_stderr": "",
+                    "cached": True
+                }
+            
+            # Slice into a temporary file and swap it in on success, so a
+            # failed run never leaves a partial model.gcode behind. The name is
+            # unique so concurrent slices (e.g. in other worker processes)
+            # never write to the same file
+            fd, tmp_name = tempfile.mkstemp(dir=mdir, prefix=".model.", suffix=".tmp.gcode")
+            os.close(fd)
+            tmp_gcode_path = Path(tmp_name)
+            generated = False
+            try:
+                slice_result = await self._slice_to_gcode(
+                    stl_path, tmp_gcode_path, profile, extra_args, mdir
+                )
+                # The placeholder mkstemp created stays empty if the slicer
+                # writes nothing
+                if slice_result["success"] and os.path.getsize(tmp_gcode_path):
+                    os.replace(tmp_gcode_path, gcode_path)
+                    generated = True
+            finally:
+                tmp_gcode_path.unlink(missing_ok=True)
             
             if not slice_result["success"]:
                 return {
@@ -82,15 +118,17 @@ class SlicerService:
                     "stdout": slice_result["stdout"]
                 }
             
-            if not gcode_path.exists():
+            if not generated:
                 return {
                     "error": "G-code not generated",
                     "details": "Slicer completed but no G-code was created"
                 }
             
+            cache_store(gcode_path, cache_path, self.settings.gcode_cache_size)
+            
             return {
                 "model_id": model_id,
-                "gcode_path": str(gcode_path.resolve()),
+                "gcode_path": str(gcode_path),
                 "slicer_stdout": slice_result["stdout"],
                 "slicer_stderr": slice_result["stderr"]
             }
@@ -103,6 +141,25 @@ class SlicerService:
                 "details": str(e)
             }
     
+    def _gcode_cache_path(
+        self,
+        stl_path: Path,
+        profile: str,
+        extra_args: Optional[Dict[str, str]]
+    ) -> Path:
+        """Get the cache entry path for G-code sliced from the given STL and settings."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(stl_path.read_bytes())
+        digest.update(self.settings.slicer_bin.encode())
+        digest.update(b"\0" + profile.encode() + b"\0")
+        # Hash the profile contents too, so editing the profile invalidates entries
+        profile_path = stl_path.parent / profile  # The slicer runs in the model directory
+        if profile_path.is_file():
+            digest.update(profile_path.read_bytes())
+        for key, value in sorted((extra_args or {}).items()):
+            digest.update(f"\0{key}={value}".encode())
+        return self.settings.gcode_cache_dir / f"{digest.hexdigest()}.gcode"
+    
     async def _generate_stl(
         self,
         scad_path: Path,
@@ -116,7 +173,12 @@ class SlicerService:
             str(scad_path)
         ]
         
-        return await run_command_async(cmd, timeout=180, cwd=cwd)
+        # Binary STL (OpenSCAD 2021.01+) is several times smaller than the
+        # default ASCII output and much cheaper to write, hash and parse
+        if await openscad_release_year(self.settings.openscad_bin) >= 2021:
+            cmd.insert(-1, "--export-format=binstl")
+        
+        return await run_command_async(cmd, timeout=180, cwd=cwd, keep_tail=True)
     
     async def _slice_to_gcode(
         self,
@@ -142,5 +204,6 @@ class SlicerService:
         return await run_command_async(
             cmd,
             timeout=self.settings.slice_timeout,
-            cwd=cwd
+            cwd=cwd,
+            keep_tail=True
         )
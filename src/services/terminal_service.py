@@ -34,6 +34,8 @@ class TerminalService:
             Path.home(),  # User's home directory
             Path.cwd(),  # Current working directory
         ]
+        # Resolved once; only the checked path needs resolving per call
+        self._resolved_allowed_dirs = [d.resolve() for d in self.allowed_base_dirs]
     
     def _is_path_allowed(self, path: Path) -> bool:
         """
@@ -46,16 +48,14 @@ class TerminalService:
             bool: True if path is allowed, False otherwise
         """
         try:
+            # The target is always resolved, so a symlink inside an allowed
+            # directory cannot point the operation outside of it
             resolved_path = path.resolve()
             # Check if path is within any allowed base directory
-            for allowed_dir in self.allowed_base_dirs:
-                try:
-                    resolved_allowed = allowed_dir.resolve()
-                    resolved_path.relative_to(resolved_allowed)
-                    return True
-                except ValueError:
-                    continue
-            return False
+            return any(
+                resolved_path.is_relative_to(allowed_dir)
+                for allowed_dir in self._resolved_allowed_dirs
+            )
         except Exception:
             return False
     
@@ -1,5 +1,6 @@
 """Workspace service for model management."""
 
+import os
 from typing import Dict, Any
 
 from config import get_settings
@@ -19,30 +20,37 @@ class WorkspaceService:
             dict: Contains list of models with their status
         """
         try:
-            self.settings.ensure_workspace()
             models_base = self.settings.models_dir
             
-            if not models_base.exists():
+            try:
+                with os.scandir(models_base) as it:
+                    model_entries = sorted(
+                        (entry for entry in it
+                         if entry.is_dir() and not entry.name.startswith(".")),
+                        key=lambda entry: entry.name
+                    )
+            except FileNotFoundError:
                 return {"models": []}
             
             models = []
-            for model_path in sorted(models_base.iterdir()):
-                if not model_path.is_dir():
-                    continue
+            for model_entry in model_entries:
+                scad_exists = False
+                gcode_exists = False
+                preview_count = 0
                 
-                model_id = model_path.name
-                
-                # Check for main.scad
-                scad_exists = (model_path / "main.scad").exists()
-                
-                # Check for gcode
-                gcode_exists = (model_path / "model.gcode").exists()
-                
-                # Count previews
-                preview_count = len(list(model_path.glob("preview_*.png")))
+                # One directory read per model instead of a stat per check
+                with os.scandir(model_entry.path) as files:
+                    for file_entry in files:
+                        name = file_entry.name
+                        if name == "main.scad":
+                            scad_exists = True
+                        elif name == "model.gcode":
+                            gcode_exists = True
+                        elif name.startswith("preview_") and name.endswith(".png"):
+                            preview_count += 1
                 
                 models.append({
-                    "model_id": model_id,
+                    "model_id": model_entry.name,
                     "scad_exists": scad_exists,
                     "gcode_exists": gcode_exists,
                     "previews": preview_count
@@ -1,6 +1,7 @@
 """CAD-related MCP tools."""
 
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List
 from mcp.server.fastmcp import FastMCP
 
 from services import CADService
@@ -65,7 +66,7 @@ def register_cad_tools(mcp: FastMCP, cad_service: CADService) -> None:
         return cad_service.get_code(model_id)
     
     @mcp.tool()
-    def cad_update_parameters(model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    async def cad_update_parameters(model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update specific parameters in the OpenSCAD model.
         
@@ -98,7 +99,9 @@ def register_cad_tools(mcp: FastMCP, cad_service: CADService) -> None:
                 "changes": {"width": "50 -> 80", "height": "30 -> 50", "wall_thickness": "2 -> 3"}
             }
         """
-        return cad_service.update_parameters(model_id, parameters)
+        # The rewrite is file I/O plus a regex pass over the source; a worker
+        # thread keeps other sessions on the sse/http transports responsive
+        return await asyncio.to_thread(cad_service.update_parameters, model_id, parameters)
     
     @mcp.tool()
     def cad_modify_model(model_id: str, instruction: str) -> Dict[str, Any]:
@@ -134,7 +137,8 @@ def register_cad_tools(mcp: FastMCP, cad_service: CADService) -> None:
         model_id: str,
         view: str = "iso",
         width: int = 800,
-        height: int = 600
+        height: int = 600,
+        quality: str = "fast"
     ) -> Dict[str, Any]:
         """
         Render a preview PNG of the model so you can see what it looks like.
@@ -153,15 +157,57 @@ def register_cad_tools(mcp: FastMCP, cad_service: CADService) -> None:
             view: View angle (iso, top, bottom, left, right, front, back)
             width: Image width in pixels (default: 800)
             height: Image height in pixels (default: 600)
+            quality: "fast" (default) returns a quick low-resolution render.
+                     "final" returns the same quick render immediately and also
+                     starts a full-resolution render in the background; it shows
+                     up at final_png_path (see cad_list_previews) when done;
+                     cad_list_previews lists it under failed_finals if it fails.
             
         Returns:
             dict: Contains model_id and png_path, or error information
             
         Example:
             >>> cad_render_preview("abc123", view="iso", width=1024, height=768)
-            {"model_id": "abc123", "png_path": "/path/to/preview_12345.png"}
+            {"model_id": "abc123", "png_path": "/path/to/preview_12345_iso.png"}
+        """
+        return await cad_service.render_preview(model_id, view, width, height, quality)
+    
+    @mcp.tool()
+    async def cad_render_previews(
+        model_id: str,
+        views: List[str],
+        width: int = 800,
+        height: int = 600
+    ) -> Dict[str, Any]:
+        """
+        Render preview PNGs of the model from several views at once.
+        
+        Use this instead of repeated cad_render_preview calls when you want to
+        compare the model from multiple angles. The views are rendered in
+        parallel, so this is much faster than rendering them one by one.
+        
+        Args:
+            model_id: The model identifier
+            views: View angles to render (iso, top, bottom, left, right, front, back)
+            width: Image width in pixels (default: 800)
+            height: Image height in pixels (default: 600)
+            
+        Returns:
+            dict: Contains model_id, previews (view -> png_path), and errors
+                  for any views that failed to render
+            
+        Example:
+            >>> cad_render_previews("abc123", views=["iso", "top", "front"])
+            {
+                "model_id": "abc123",
+                "previews": {
+                    "iso": "/path/to/preview_12345_iso.png",
+                    "top": "/path/to/preview_12345_top.png",
+                    "front": "/path/to/preview_12345_front.png"
+                }
+            }
         """
-        return await cad_service.render_preview(model_id, view, width, height)
+        return await cad_service.render_previews(model_id, views, width, height)
     
     @mcp.tool()
     def cad_list_previews(model_id: str) -> Dict[str, Any]:
@@ -175,15 +221,17 @@ def register_cad_tools(mcp: FastMCP, cad_service: CADService) -> None:
             model_id: The model identifier
             
         Returns:
-            dict: Contains model_id and list of previews with file and mtime
+            dict: Contains model_id and list of previews with file and mtime,
+                plus failed_finals (file and error) for background "final"
+                renders that failed
             
         Example:
             >>> cad_list_previews("abc123")
             {
                 "model_id": "abc123",
                 "previews": [
-                    {"file": "preview_12345.png", "mtime": 1234567890.0},
-                    {"file": "preview_12346.png", "mtime": 1234567900.0}
+                    {"file": "preview_12345_iso.png", "mtime": 1234567890.0},
+                    {"file": "preview_12346_top.png", "mtime": 1234567900.0}
                 ]
             }
         """
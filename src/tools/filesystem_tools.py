@@ -1,5 +1,6 @@
 """Filesystem-related MCP tools."""
 
+import asyncio
 from typing import Dict, Any
 from mcp.server.fastmcp import FastMCP
 
@@ -26,7 +27,9 @@ def register_filesystem_tools(mcp: FastMCP, filesystem_service: FilesystemServic
             encoding: Text encoding (default: 'utf-8'). Use 'binary' for binary files.
             
         Returns:
-            dict: Contains file content, size, mime type, and metadata
+            dict: Contains file content, size, mime type, and metadata. With
+                encoding='binary' the bytes are returned as standard base64
+                in content_base64 (earlier versions returned hex there).
             
         Example:
             >>> filesystem_read_file("~/myfile.txt")
@@ -41,7 +44,7 @@ def register_filesystem_tools(mcp: FastMCP, filesystem_service: FilesystemServic
         return filesystem_service.read_file(file_path, encoding)
     
     @mcp.tool()
-    def filesystem_write_file(
+    async def filesystem_write_file(
         file_path: str,
         content: str,
         encoding: str = "utf-8",
@@ -75,7 +78,10 @@ def register_filesystem_tools(mcp: FastMCP, filesystem_service: FilesystemServic
                 "message": "File written successfully"
             }
         """
-        return filesystem_service.write_file(file_path, content, encoding, create_dirs)
+        # Large writes would otherwise hold up the event loop
+        return await asyncio.to_thread(
+            filesystem_service.write_file, file_path, content, encoding, create_dirs
+        )
     
     @mcp.tool()
     def filesystem_list_directory(
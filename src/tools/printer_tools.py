@@ -52,7 +52,10 @@ def register_printer_tools(mcp: FastMCP, printer_service: PrinterService) -> Non
             model_id: The model identifier
             
         Returns:
-            dict: Contains upload_result and start_result from OctoPrint
+            dict: Contains upload_result from OctoPrint and start_result
+                  (whether OctoPrint selected the file and started the job:
+                  true, false, or "unknown" if OctoPrint did not say), or
+                  error information if OctoPrint reports it did not start
             
         Example:
             >>> printer_upload_and_start("abc123")
@@ -3,10 +3,18 @@
 from .validation import sanitize_model_id
 from .command import run_command_safe, run_command_async
 from .paths import get_model_dir
+from .cache import cache_lookup, cache_store
+from .files import atomic_write_text, atomic_copy
+from .openscad import openscad_release_year
 
 __all__ = [
     "sanitize_model_id",
     "run_command_safe",
     "run_command_async",
     "get_model_dir",
+    "cache_lookup",
+    "cache_store",
+    "atomic_write_text",
+    "atomic_copy",
+    "openscad_release_year",
 ]
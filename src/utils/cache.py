@@ -0,0 +1,59 @@
+"""Content-addressed file cache utilities."""
+
+import os
+from pathlib import Path
+
+from .files import atomic_copy
+
+
+def cache_lookup(cache_path: Path, dst: Path) -> bool:
+    """
+    Copy a cache entry to dst if it exists.
+    
+    dst gets its own copy rather than a link to the entry, so later edits
+    to it (which may truncate in place) never reach the cache. A hit
+    refreshes the entry's mtime so eviction is least-recently-used.
+    
+    Args:
+        cache_path: Cache entry to look up
+        dst: Destination for the cached file
+    
+    Returns:
+        bool: True on a cache hit, False otherwise
+    """
+    try:
+        atomic_copy(cache_path, dst)
+        os.utime(cache_path)
+        return True
+    except OSError:
+        return False
+
+
+def cache_store(src: Path, cache_path: Path, max_entries: int) -> None:
+    """
+    Add a copy of a file to a cache directory, evicting least recently used entries.
+    
+    The cache is an optimization only, so filesystem errors are swallowed
+    rather than failing the operation that produced the file.
+    
+    Args:
+        src: Freshly produced file to cache
+        cache_path: Cache entry path (its parent is the cache directory)
+        max_entries: Maximum number of entries to keep in the directory
+    """
+    try:
+        cache_dir = cache_path.parent
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_copy(src, cache_path)
+        
+        suffix = cache_path.suffix
+        entries = sorted(
+            (entry.stat().st_mtime, entry.path)
+            for entry in os.scandir(cache_dir)
+            if entry.name.endswith(suffix) and not entry.name.startswith(".")
+        )
+        excess = len(entries) - max_entries
+        for _, path in entries[:max(excess, 0)]:
+            os.unlink(path)
+    except OSError:
+        pass
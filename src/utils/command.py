@@ -78,7 +78,9 @@ def run_command_safe(
 async def run_command_async(
     args: List[str],
     timeout: Optional[int] = None,
-    cwd: Optional[Path] = None
+    cwd: Optional[Path] = None,
+    input: Optional[bytes] = None,
+    keep_tail: bool = False
 ) -> Dict[str, Any]:
     """
     Asynchronously run a command and capture output.
@@ -96,6 +98,9 @@ async def run_command_async(
         args: Command and arguments as a list
         timeout: Timeout in seconds (uses config default if None)
         cwd: Working directory for command execution
+        input: Bytes to send to the command's stdin (stdin is /dev/null if None)
+        keep_tail: Keep the end of long output instead of the start (for tools
+                   like OpenSCAD and slicers that report errors last)
         
     Returns:
         dict: Contains stdout, stderr, exit_code, and optional error message
@@ -106,22 +111,42 @@ async def run_command_async(
     
     max_output = settings.max_output_length
     
+    # UTF-8 needs at most 4 bytes per character, so this many bytes always
+    # decode to at least max_output characters
+    max_bytes = max_output * 4
+    
     try:
+        # Never inherit our stdin: under stdio transport it carries the
+        # JSON-RPC stream.
+        # Don't add preexec_fn, user/group or umask here: without them CPython
+        # (3.10+ on Linux) launches the child with vfork(), so spawning OpenSCAD
+        # does not copy the server's page tables. posix_spawn() would also need
+        # cwd=None, and the OpenSCAD/slicer commands depend on cwd.
         process = await asyncio.create_subprocess_exec(
             *args,
+            stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
             cwd=cwd
         )
         
         try:
-            stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                process.communicate(),
+            stdout_bytes, stderr_bytes, _, _ = await asyncio.wait_for(
+                asyncio.gather(
+                    _read_bounded(process.stdout, max_bytes, keep_tail),
+                    _read_bounded(process.stderr, max_bytes, keep_tail),
+                    _write_input(process.stdin, input),
+                    process.wait()
+                ),
                 timeout=timeout
             )
             
-            stdout = stdout_bytes.decode('utf-8', errors='replace')[:max_output]
-            stderr = stderr_bytes.decode('utf-8', errors='replace')[:max_output]
+            stdout = stdout_bytes.decode('utf-8', errors='replace')
+            stderr = stderr_bytes.decode('utf-8', errors='replace')
+            if keep_tail:
+                stdout, stderr = stdout[-max_output:], stderr[-max_output:]
+            else:
+                stdout, stderr = stdout[:max_output], stderr[:max_output]
             
             return {
                 "stdout": stdout,
@@ -155,3 +180,44 @@ async def run_command_async(
             "success": False,
             "error": str(e)
         }
+
+
+async def _read_bounded(stream: asyncio.StreamReader, limit: int, tail: bool = False) -> bytes:
+    """
+    Read a subprocess pipe to EOF, keeping at most `limit` bytes.
+    
+    The rest of the output is still drained so the child never blocks on a
+    full pipe, but it is discarded instead of accumulating in memory. By
+    default the first `limit` bytes are kept; with tail=True the buffer acts
+    as a ring and keeps the last `limit` bytes.
+    """
+    buf = bytearray()
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        if tail:
+            buf += chunk
+            # Trim only once the buffer reaches twice the limit, so the
+            # memmove is amortized over at least `limit` bytes of input
+            if len(buf) >= 2 * limit:
+                del buf[:len(buf) - limit]
+        elif len(buf) < limit:
+            buf += chunk[:limit - len(buf)]
+    if tail and len(buf) > limit:
+        del buf[:len(buf) - limit]
+    return bytes(buf)
+
+
+async def _write_input(stream: Optional[asyncio.StreamWriter], data: Optional[bytes]) -> None:
+    """Send data to a subprocess's stdin and close it."""
+    if stream is None:
+        return
+    try:
+        stream.write(data)
+        await stream.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        # The process exited without reading all of its input
+        pass
+    finally:
+        stream.close()
@@ -0,0 +1,61 @@
+"""File writing utilities."""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+
+# Permission bits open() would give a new file under the process umask
+# (mkstemp itself always creates files as 0600)
+_umask = os.umask(0)
+os.umask(_umask)
+_NEW_FILE_MODE = 0o666 & ~_umask
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Replace a text file's contents atomically.
+    
+    The text is encoded once and written with a single write to a uniquely
+    named temporary sibling, which is then swapped into place with
+    os.replace. Readers (such as OpenSCAD's automatic reload) never observe
+    a half-written file, and concurrent writers (including other server
+    worker processes) never share a temporary file.
+    
+    Args:
+        path: File to write
+        text: New file contents
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(text.encode("utf-8"))
+        os.chmod(tmp, _NEW_FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def atomic_copy(src: Path, dst: Path) -> None:
+    """
+    Replace dst with a copy of src atomically.
+    
+    The data is copied (in-kernel where the platform allows) into a
+    uniquely named temporary sibling, which is then swapped into place with
+    os.replace, so readers and concurrent writers never see a partial file.
+    
+    Args:
+        src: File to copy
+        dst: Destination path
+    """
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.chmod(tmp, _NEW_FILE_MODE)
+        os.replace(tmp, dst)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,29 @@
+"""OpenSCAD capability detection."""
+
+import re
+from typing import Dict
+
+from utils.command import run_command_async
+
+# Release year per OpenSCAD binary (0 if unknown), probed once per process
+_release_years: Dict[str, int] = {}
+
+
+async def openscad_release_year(openscad_bin: str) -> int:
+    """
+    Get the release year of an OpenSCAD binary (cached).
+    
+    OpenSCAD versions are date based (e.g. 2021.01), so the year is enough
+    to tell which command-line features are available.
+    
+    Args:
+        openscad_bin: Path to the OpenSCAD executable
+        
+    Returns:
+        int: Release year, or 0 if the version could not be determined
+    """
+    if openscad_bin not in _release_years:
+        result = await run_command_async([openscad_bin, "--version"], timeout=10)
+        match = re.search(r"(\d{4})\.\d{2}", result["stdout"] + result["stderr"])
+        _release_years[openscad_bin] = int(match.group(1)) if match else 0
+    return _release_years[openscad_bin]
@@ -2,6 +2,10 @@
 
 import re
 
+# Only allow alphanumeric, hyphens, and underscores. fullmatch() rather than
+# a $ anchor, which would also accept a trailing newline.
+_MODEL_ID_PATTERN = re.compile(r'[a-zA-Z0-9_-]+')
+
 
 def sanitize_model_id(model_id: str) -> str:
     """
@@ -16,8 +20,7 @@ def sanitize_model_id(model_id: str) -> str:
     Raises:
         ValueError: If model_id contains invalid characters
     """
-    # Only allow alphanumeric, hyphens, and underscores
-    if not re.match(r'^[a-zA-Z0-9_-]+$', model_id):
+    if not _MODEL_ID_PATTERN.fullmatch(model_id):
         raise ValueError(
             f"Invalid model_id: {model_id}. "
             "Only alphanumeric, hyphens, and underscores allowed."
@@ -9,8 +9,12 @@ This script tests:
 4. Basic operations
 """
 
+import os
 import sys
+import base64
 import asyncio
+import tempfile
+import contextlib
 from pathlib import Path
 
 # Add src to path
@@ -18,8 +22,22 @@ src_dir = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_dir))
 
 from config import get_settings
-from services import CADService, SlicerService, PrinterService, WorkspaceService
-from utils import sanitize_model_id, get_model_dir
+from services import (
+    CADService,
+    SlicerService,
+    PrinterService,
+    WorkspaceService,
+    FilesystemService,
+)
+from utils import (
+    sanitize_model_id,
+    get_model_dir,
+    cache_lookup,
+    cache_store,
+    atomic_write_text,
+    atomic_copy,
+    run_command_async,
+)
 
 
 def test_configuration():
@@ -64,6 +82,12 @@ def test_validation():
     except ValueError:
         pass
     
+    try:
+        sanitize_model_id("abc123\n")
+        assert False, "Should have raised ValueError"
+    except ValueError:
+        pass
+    
     print("✓ Validation tests passed")
 
 
@@ -86,6 +110,46 @@ def test_services():
     print("✓ Service initialization tests passed")
 
 
+def test_batch_endpoint():
+    """Test /api/cad/batch in sequential and parallel mode."""
+    print("\nTesting batch endpoint...")
+    
+    from starlette.testclient import TestClient
+    from server import create_web_app, get_services
+    
+    client = TestClient(create_web_app())
+    model_id = get_services().cad.create_model("Batch test")["model_id"]
+    
+    # Sequential ops see each other's effects, in order
+    response = client.post("/api/cad/batch", json={"ops": [
+        {"op": "update-parameters", "model_id": model_id, "parameters": {"width": 70}},
+        {"op": "get-code", "model_id": model_id},
+        {"op": "no-such-op"},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["updated"] == ["width"]
+    assert "width = 70;" in results[1]["scad_code"]
+    assert results[2]["error"] == "Unknown op: no-such-op"
+    
+    # Parallel ops still return results in op order
+    response = client.post("/api/cad/batch", json={"parallel": True, "ops": [
+        {"op": "list-previews", "model_id": model_id},
+        {"op": "get-code", "model_id": model_id},
+        {"op": "get-code", "model_id": "missing-model"},
+    ]})
+    results = response.json()["results"]
+    assert results[0]["previews"] == []
+    assert results[1]["model_id"] == model_id
+    assert results[2]["error"] == "Model not found"
+    
+    response = client.post("/api/cad/batch", json={"ops": "get-code"})
+    assert response.status_code == 400
+    print("  Ran sequential and parallel batches")
+    
+    print("✓ Batch endpoint tests passed")
+
+
 async def test_cad_operations():
     """Test CAD service operations."""
     print("\nTesting CAD operations...")
@@ -120,9 +184,167 @@ async def test_cad_operations():
     assert len(result["previews"]) == 0
     print(f"  Listed previews: {len(result['previews'])}")
     
+    # Test preview cache hit (no OpenSCAD invocation needed)
+    scad_bytes = (get_model_dir(model_id) / "main.scad").read_bytes()
+    cache_path = cad._preview_cache_path(scad_bytes, "iso", 320, 240)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_bytes(b"cached-png")
+    result = await cad.render_preview(model_id, "iso", 320, 240)
+    assert result.get("cached") is True
+    assert Path(result["png_path"]).read_bytes() == b"cached-png"
+    print(f"  Served preview from cache: {Path(result['png_path']).name}")
+    
     print("✓ CAD operation tests passed")
 
 
+# Stand-in OpenSCAD whose fast (--preview) renders succeed and whose full
+# (--render) renders fail
+_FAILING_FINAL_OPENSCAD = """\
+import sys
+args = sys.argv[1:]
+if "--version" in args:
+    sys.exit("OpenSCAD version 2021.01")
+if "--render" in args:
+    sys.exit("ERROR: CGAL failed on this model")
+if args[-1] == "-":
+    sys.stdin.buffer.read()
+with open(args[args.index("-o") + 1], "wb") as f:
+    f.write(b"fast-png")
+"""
+
+
+# Stand-in OpenSCAD that takes a moment per render and logs each one to
+# <script>.runs
+_COUNTING_OPENSCAD = """\
+import sys, time
+args = sys.argv[1:]
+if "--version" in args:
+    sys.exit("OpenSCAD version 2021.01")
+if args[-1] == "-":
+    sys.stdin.buffer.read()
+time.sleep(0.3)
+with open(__file__ + ".runs", "a") as f:
+    f.write("run\\n")
+with open(args[args.index("-o") + 1], "wb") as f:
+    f.write(b"png")
+"""
+
+
+@contextlib.contextmanager
+def fake_openscad(source):
+    """Point OPENSCAD_BIN at a Python stand-in script while in the block."""
+    settings = get_settings()
+    original_bin = settings.openscad_bin
+    with tempfile.TemporaryDirectory() as tmp:
+        fake_bin = Path(tmp) / "openscad"
+        fake_bin.write_text(f"#!{sys.executable}\n{source}")
+        fake_bin.chmod(0o755)
+        settings.openscad_bin = str(fake_bin)
+        try:
+            yield fake_bin
+        finally:
+            settings.openscad_bin = original_bin
+
+
+async def test_final_preview_failure():
+    """Test that a failed background final render is reported."""
+    print("\nTesting final preview failure...")
+    
+    cad = CADService()
+    with fake_openscad(_FAILING_FINAL_OPENSCAD):
+        model_id = cad.create_model("Final render test")["model_id"]
+        result = await cad.render_preview(model_id, "top", 64, 48, quality="final")
+        assert "error" not in result, result
+        assert result["final_status"] == "rendering"
+        await asyncio.gather(*cad._background_renders)
+    
+    fast_path = Path(result["png_path"])
+    final_path = Path(result["final_png_path"])
+    assert fast_path.read_bytes() == b"fast-png"
+    assert not final_path.exists()
+    assert "CGAL failed" in final_path.with_suffix(".error.txt").read_text()
+    
+    # list_previews shows the fast image and reports the failed final one
+    result = cad.list_previews(model_id)
+    assert [preview["file"] for preview in result["previews"]] == [fast_path.name]
+    assert len(result["failed_finals"]) == 1
+    assert result["failed_finals"][0]["file"] == final_path.name
+    assert "CGAL failed" in result["failed_finals"][0]["error"]
+    print(f"  Reported failed final render: {final_path.name}")
+    
+    print("✓ Final preview failure tests passed")
+
+
+async def test_concurrent_previews():
+    """Test render coalescing and multi-view rendering."""
+    print("\nTesting concurrent previews...")
+    
+    cad = CADService()
+    with fake_openscad(_COUNTING_OPENSCAD) as fake_bin:
+        runs = Path(f"{fake_bin}.runs")
+        model_id = cad.create_model("Coalescing test")["model_id"]
+        
+        # Identical concurrent requests share one OpenSCAD run
+        first, second = await asyncio.gather(
+            cad.render_preview(model_id, "front", 96, 72),
+            cad.render_preview(model_id, "front", 96, 72),
+        )
+        assert runs.read_text().count("run") == 1
+        assert first["png_path"] != second["png_path"]
+        assert Path(first["png_path"]).read_bytes() == b"png"
+        assert Path(second["png_path"]).read_bytes() == b"png"
+        
+        # Multi-view renders skip duplicates and reuse the cached view
+        result = await cad.render_previews(model_id, ["front", "left", "left", "back"], 96, 72)
+        assert sorted(result["previews"]) == ["back", "front", "left"]
+        assert "errors" not in result
+        assert runs.read_text().count("run") == 3
+    print("  Coalesced identical renders and rendered 3 views with 3 runs")
+    
+    print("✓ Concurrent preview tests passed")
+
+
+async def test_command_runner():
+    """Test bounded output capture in run_command_async."""
+    print("\nTesting command runner...")
+    
+    limit = get_settings().max_output_length
+    script = (
+        "import sys\n"
+        f"print('x' * {limit * 3})\n"
+        "print('END')\n"
+        f"print('e' * {limit * 3}, file=sys.stderr)\n"
+        "print('last error', file=sys.stderr)\n"
+    )
+    
+    # keep_tail keeps the end of long output, where tools report errors
+    result = await run_command_async([sys.executable, "-c", script], keep_tail=True)
+    assert result["success"]
+    assert len(result["stdout"]) == limit
+    assert result["stdout"].endswith("x\nEND\n")
+    assert len(result["stderr"]) == limit
+    assert result["stderr"].endswith("e\nlast error\n")
+    
+    # By default the start is kept
+    result = await run_command_async([sys.executable, "-c", script])
+    assert len(result["stdout"]) == limit
+    assert set(result["stdout"]) == {"x"}
+    print(f"  Kept the last {limit} characters of each stream")
+    
+    # input= is piped to stdin (larger than a pipe buffer, to exercise
+    # writing while output is read); without it stdin is empty
+    reader = "import sys; data = sys.stdin.buffer.read(); print(len(data), data[-6:])"
+    data = b"cube(1);\n" * 200000 + b"tail\n"
+    result = await run_command_async([sys.executable, "-c", reader], input=data)
+    assert result["success"]
+    assert result["stdout"] == f"{len(data)} b'\\ntail\\n'\n"
+    result = await run_command_async([sys.executable, "-c", reader], timeout=10)
+    assert result["stdout"] == "0 b''\n"
+    print(f"  Piped {len(data)} bytes to stdin")
+    
+    print("✓ Command runner tests passed")
+
+
 async def test_workspace_operations():
     """Test workspace service operations."""
     print("\nTesting workspace operations...")
@@ -137,6 +359,192 @@ async def test_workspace_operations():
     print("✓ Workspace operation tests passed")
 
 
+def test_atomic_writes():
+    """Test atomic file replacement helpers."""
+    print("\nTesting atomic writes...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # A plain open() shows the mode new files should get under the umask
+        (tmp / "plain.txt").write_text("x")
+        expected_mode = (tmp / "plain.txt").stat().st_mode & 0o777
+        
+        target = tmp / "main.scad"
+        atomic_write_text(target, "cube(1);\n")
+        atomic_write_text(target, "cube(2);\n")
+        assert target.read_text() == "cube(2);\n"
+        assert target.stat().st_mode & 0o777 == expected_mode
+        
+        copy = tmp / "copy.scad"
+        atomic_copy(target, copy)
+        assert copy.read_bytes() == target.read_bytes()
+        assert copy.stat().st_mode & 0o777 == expected_mode
+        
+        # A failed copy raises and leaves the destination untouched
+        try:
+            atomic_copy(tmp / "missing.scad", copy)
+            assert False, "Should have raised OSError"
+        except OSError:
+            pass
+        assert copy.read_text() == "cube(2);\n"
+        
+        # No temporary files are left behind
+        assert sorted(os.listdir(tmp)) == ["copy.scad", "main.scad", "plain.txt"]
+        print(f"  Replaced files with mode {oct(expected_mode)}, no temp files left")
+    
+    print("✓ Atomic write tests passed")
+
+
+def test_content_cache():
+    """Test the content-addressed cache helpers."""
+    print("\nTesting content cache...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache_dir = tmp / "cache"
+        src = tmp / "render.png"
+        dst = tmp / "preview.png"
+        
+        # Three entries with increasing (explicit) mtimes fill the cache
+        for i in range(3):
+            src.write_bytes(f"png{i}".encode())
+            cache_store(src, cache_dir / f"k{i}.png", 3)
+            os.utime(cache_dir / f"k{i}.png", (1000 + i, 1000 + i))
+        (cache_dir / "unrelated.txt").write_text("kept")
+        
+        # A hit copies the entry out and marks it most recently used
+        assert cache_lookup(cache_dir / "k0.png", dst)
+        assert dst.read_bytes() == b"png0"
+        dst.write_bytes(b"edited")
+        assert (cache_dir / "k0.png").read_bytes() == b"png0"
+        
+        # Storing a fourth entry evicts the least recently used one (k1)
+        src.write_bytes(b"png3")
+        cache_store(src, cache_dir / "k3.png", 3)
+        names = sorted(name for name in os.listdir(cache_dir) if name.endswith(".png"))
+        assert names == ["k0.png", "k2.png", "k3.png"], names
+        assert (cache_dir / "unrelated.txt").exists()
+        assert not cache_lookup(cache_dir / "k1.png", dst)
+        assert dst.read_bytes() == b"edited"
+        print(f"  Evicted least recently used entry, kept {names}")
+    
+    print("✓ Content cache tests passed")
+
+
+def test_preview_rewrite():
+    """Test the low-resolution source rewrite used for fast previews."""
+    print("\nTesting preview rewrite...")
+    
+    rewrite = CADService._rewrite_for_preview
+    
+    # $fn is injected only when the model does not set it itself
+    assert rewrite("cube(1);\n").startswith("$fn = 8;\n")
+    assert "$fn = 8;" not in rewrite("$fn = 64;\ncube(1);\n")
+    assert rewrite("  $fn=32;\nsphere(1);\n").count("$fn") == 1
+    
+    # Top-level difference() around a loop is wrapped in render()
+    looped = "difference() {\n    cube(10);\n    for (i = [0:3]) translate([i, 0, 0]) cube(1);\n}\n"
+    assert rewrite(looped) == "$fn = 8;\nrender() " + looped
+    
+    # ...but a plain difference(), or a nested one, is left alone
+    plain = "difference() {\n    cube(10);\n    sphere(6);\n}\n"
+    assert "render()" not in rewrite(plain)
+    nested = "union() {\n  difference() {\n    for (i = [0:3]) cube(i);\n  }\n}\n"
+    assert "render()" not in rewrite(nested)
+    print("  Injected $fn and wrapped looped difference() in render()")
+    
+    print("✓ Preview rewrite tests passed")
+
+
+def test_parameter_updates():
+    """Test that parameter updates only touch the parameter block."""
+    print("\nTesting parameter updates...")
+    
+    cad = CADService()
+    model_id = cad.create_model("Parameter test")["model_id"]
+    scad_path = get_model_dir(model_id) / "main.scad"
+    scad_path.write_text(
+        "width = 50;\n"
+        "height = 30;\n"
+        "cube([width, 10, height]);\n"
+        "module inner() {\n"
+        "    width = 3;\n"
+        "    cube(width);\n"
+        "}\n"
+        "height = 999;\n"
+    )
+    
+    result = cad.update_parameters(model_id, {"width": 80, "height": 40, "depth": 5})
+    assert result["updated"] == ["width", "height"]
+    assert result["not_found"] == ["depth"]
+    assert result["changes"] == {"width": "50 -> 80", "height": "30 -> 40"}
+    
+    # Only the first assignment of each parameter is rewritten; the scan
+    # stops there, so later assignments and notes keep their values
+    content = scad_path.read_text()
+    assert content.startswith("width = 80;\nheight = 40;\n")
+    assert "\n    width = 3;\n" in content
+    assert "\nheight = 999;\n" in content
+    assert content.count("// Updated parameters at") == 1
+    print(f"  Updated {result['updated']}, later assignments untouched")
+    
+    print("✓ Parameter update tests passed")
+
+
+def test_filesystem_operations():
+    """Test filesystem service operations."""
+    print("\nTesting filesystem operations...")
+    
+    fs = FilesystemService()
+    test_dir = get_settings().workspace_dir / "test_filesystem"
+    test_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Binary reads return standard base64 that round-trips to the bytes
+    data = bytes(range(256)) * 4
+    (test_dir / "blob.bin").write_bytes(data)
+    result = fs.read_file(str(test_dir / "blob.bin"), encoding="binary")
+    assert "error" not in result
+    assert result["is_binary"] is True
+    assert result["size"] == len(data)
+    assert base64.b64decode(result["content_base64"], validate=True) == data
+    print(f"  Read binary file as base64: {result['size']} bytes")
+    
+    # Directory listings: recursion, hidden entries and symlinks
+    (test_dir / "blob.bin").unlink()
+    (test_dir / "sub").mkdir()
+    (test_dir / "a.txt").write_text("a")
+    (test_dir / ".hidden").write_text("h")
+    (test_dir / "sub" / "b.txt").write_text("bb")
+    (test_dir / "sub" / ".secret").write_text("s")
+    (test_dir / "link_dir").symlink_to(test_dir / "sub", target_is_directory=True)
+    (test_dir / "link_file").symlink_to(test_dir / "a.txt")
+    
+    result = fs.list_directory(str(test_dir))
+    entries = {entry["path"]: entry for entry in result["entries"]}
+    assert sorted(entries) == ["a.txt", "link_dir", "link_file", "sub"]
+    assert entries["link_dir"]["type"] == "directory"
+    assert entries["link_file"]["type"] == "file"
+    assert entries["link_file"]["size"] == 1
+    assert entries["sub"]["absolute_path"] == str(test_dir.resolve() / "sub")
+    
+    # Recursion descends into real directories only, not symlinked ones
+    result = fs.list_directory(str(test_dir), recursive=True)
+    paths = sorted(entry["path"] for entry in result["entries"])
+    assert paths == ["a.txt", "link_dir", "link_file", "sub", os.path.join("sub", "b.txt")]
+    assert result["count"] == len(paths)
+    
+    result = fs.list_directory(str(test_dir), show_hidden=True, recursive=True)
+    paths = sorted(entry["path"] for entry in result["entries"])
+    assert ".hidden" in paths
+    assert os.path.join("sub", ".secret") in paths
+    assert len(paths) == 7
+    print(f"  Listed {len(paths)} entries recursively")
+    
+    fs.delete_path(str(test_dir), recursive=True)
+    
+    print("✓ Filesystem operation tests passed")
+
+
 async def main():
     """Run all tests."""
     print("=" * 70)
@@ -148,9 +556,18 @@ async def main():
         test_configuration()
         test_validation()
         test_services()
+        test_atomic_writes()
+        test_content_cache()
+        test_preview_rewrite()
+        test_parameter_updates()
+        test_filesystem_operations()
+        test_batch_endpoint()
         
         # Asynchronous tests
         await test_cad_operations()
+        await test_final_preview_failure()
+        await test_concurrent_previews()
+        await test_command_runner()
         await test_workspace_operations()
         
         print("\n" + "=" * 70)